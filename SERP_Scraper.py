@@ -1,20 +1,26 @@
-import requests
-import base64
 import json
+import sys
+import argparse
 from storage.database_manager import DatabaseManager
 from config.manager import ConfigManager
-from bs4 import BeautifulSoup
 import sqlite3
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-import random
-import re
 from colorama import init, Fore, Style
 from agents.analyzer import OpenRouterAnalyzer
 import asyncio
-import chardet
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from agents.content_processor import ContentProcessor
 from agents.intent_agent import IntentAgent
+from agents.llm_client import OpenRouterClient
+from scraper.fetcher import AsyncFetcher
+from scraper.extractor import extract_seo_content, set_error_phrases
+from scraper.matcher import DomainMatcher
+from scraper.dedup import NearDuplicateIndex, simhash
+from storage.page_cache import PageCache, content_hash
+from storage.serp_cache import SerpCache
+from storage.llm_cache import LlmCache
+from storage.db_writer import DatabaseWriter
+from storage.checkpoints import RunCheckpoints, start_run, load_run
+from scraper.serp import SerpClient
 import os
 import aiohttp
 
@@ -29,171 +35,46 @@ def show_title_screen():
     print("\nInitializing web scraper...")
     print("Establishing database connection...\n")
 
-# Show title screen at startup
-show_title_screen()
-
-# Initialize database and config
-db = DatabaseManager()
-config = ConfigManager()
-
-# Get credentials from config
-cred = base64.b64encode(
-    f"{config.email}:{config.api_key}".encode()
-).decode()
-
-# Set the API endpoint
-url = "https://api.dataforseo.com/v3/serp/google/organic/live/advanced"
-
-# Define the payload with the query "who is the current president"
-keyword = input("Enter search keyword: ").strip()
-
-payload = [
-   {
-       "language_code": "en",
-       "location_code": 2840,  # United States
-       "keyword": keyword
-   }
-]
-
-# Set headers
-headers = {
-   "Authorization": f"Basic {cred}",
-   "Content-Type": "application/json"
-}
-
-# Make the POST request
-response = requests.post(url, headers=headers, json=payload)
-
-# Add list of domains to exclude
-BLACKLISTED_DOMAINS = {
-    'reddit.com',
-    'youtube.com',
-    'vimeo.com',
-    'tiktok.com',
-    'twitter.com',
-    'facebook.com',
-    'instagram.com',
-    'quora.com',
-    'pinterest.com'
-}
-
 def is_valid_url(url):
     if not url:
         return False
-    return not any(domain in url.lower() for domain in BLACKLISTED_DOMAINS)
-
-# Configure stealth headers
-USER_AGENTS = [
-    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15',
-    'Mozilla/5.0 (X11; Linux x86_64; rv:89.0) Gecko/20100101 Firefox/89.0'
-]
-
-def create_session():
-    session = requests.Session()
-    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504])
-    session.mount('https://', HTTPAdapter(max_retries=retries))
-    return session
+    try:
+        return not blacklist.matches(url)
+    except ValueError:
+        # Malformed URLs (e.g. a broken IPv6 host) could not be fetched anyway
+        return False
 
-def scrape_seo_content(url):
+async def scrape_seo_content(fetcher, pool, cache_executor, url):
     try:
-        response = requests.get(url, timeout=15)
-        response.raise_for_status()
+        # Cache reads and writes run on their own thread so SQLite never blocks the event loop
+        loop = asyncio.get_running_loop()
+        cached = await loop.run_in_executor(cache_executor, page_cache.get, url) if page_cache else None
+        if cached and cached['fresh']:
+            print(f"{Fore.GREEN}Cache hit: {url}{Style.RESET_ALL}")
+            await loop.run_in_executor(cache_executor, page_cache.touch, url)
+            return cached['markdown']
         
-        if 'charset=' in response.headers.get('content-type', ''):
-            encoding = response.headers['content-type'].split('charset=')[-1]
+        if cached:
+            result = await fetcher.fetch(url, cached['etag'], cached['last_modified'])
         else:
-            detected = chardet.detect(response.content)
-            encoding = detected['encoding'] if detected['confidence'] > 0.9 else 'utf-8'
-            
-        try:
-            content = response.content.decode(encoding, errors='strict')
-        except UnicodeDecodeError:
-            content = response.content.decode(encoding, errors='replace')
-            
-        error_phrases = [
-            'technical difficulties',
-            'please try again',
-            'forbidden',
-            'access denied',
-            'unavailable',
-            'error occurred',
-            'we\'re sorry',
-            'temporarily unavailable'
-        ]
+            result = await fetcher.fetch(url)
         
-        if any(phrase.lower() in content.lower() for phrase in error_phrases):
-            return None
-            
-        soup = BeautifulSoup(content, 'html.parser')
+        # Unchanged pages reuse the stored markdown without parsing again
+        body_hash = content_hash(result.body)
+        if cached and (result.status == 304 or cached['content_hash'] == body_hash):
+            print(f"{Fore.GREEN}Revalidated: {url}{Style.RESET_ALL}")
+            await loop.run_in_executor(cache_executor, page_cache.touch, url, True)
+            return cached['markdown']
         
-        for tag in ['script', 'style', 'nav', 'footer', 'header', 'aside', 
-                   'form', 'iframe', 'button', 'noscript', 'meta', 'link']:
-            for element in soup(tag):
-                element.decompose()
-
-        first_heading = None
-        for heading_level in range(1, 7):
-            first_heading = soup.find(f'h{heading_level}')
-            if first_heading:
-                break
-
-        if not first_heading:
-            first_heading = soup.find(['article', 'main']) or soup.body
-
-        if not first_heading:
-            return None
-
-        main_content = []
-        current_element = first_heading
-        while current_element:
-            main_content.append(current_element)
-            current_element = current_element.find_next()
-
-        footer = soup.find('footer')
-        if footer:
-            for element in main_content:
-                if element == footer:
-                    main_content = main_content[:main_content.index(element)]
-                    break
-
-        clean_md = []
-        current_list_type = None
+        # Parsing is CPU-bound, so it runs in a worker process off the event loop
+        markdown = await loop.run_in_executor(
+            pool, extract_seo_content, result.content_type, result.body, config.parser_backend
+        )
         
-        for element in main_content:
-            try:
-                text = element.get_text(' ', strip=True)
-                if not text:
-                    continue
-
-                if element.name.startswith('h'):
-                    level = element.name[1]
-                    clean_md.append(f"\n{'#' * int(level)} {text}\n\n")
-                    current_list_type = None
-                
-                elif element.name == 'p':
-                    clean_md.append(f"{text}\n\n")
-                    current_list_type = None
-                
-                elif element.name == 'li':
-                    list_type = element.find_previous(['ul', 'ol'])
-                    if list_type and list_type.name == 'ul':
-                        clean_md.append(f"- {text}\n")
-                    else:
-                        pos = len([li for li in list_type.find_all('li')]) if list_type else 1
-                        clean_md.append(f"{pos}. {text}\n")
-                    current_list_type = list_type.name if list_type else None
-                
-                elif element.name == 'blockquote':
-                    clean_md.append(f"> {text}\n\n")
-                    current_list_type = None
-
-            except Exception as e:
-                continue
-
-        formatted = '\n'.join(clean_md)
-        formatted = re.sub(r'\n{3,}', '\n\n', formatted)
-        return formatted.strip()
+        if page_cache:
+            await loop.run_in_executor(cache_executor, page_cache.store, url, result.content_type,
+                                       result.etag, result.last_modified, result.body, body_hash, markdown)
+        return markdown
         
     except Exception as e:
         print(f"{Fore.RED}Error scraping {url}: {str(e)}{Style.RESET_ALL}")
@@ -202,12 +83,12 @@ def scrape_seo_content(url):
 def process_results(items):
     return [item['url'] for item in items if 'url' in item and is_valid_url(item['url'])]
 
-async def run_analysis(collected_urls):
-    processor = ContentProcessor(db)
+async def run_analysis(collected_urls, llm):
+    processor = ContentProcessor(db, llm)
     processed_data = await processor.process_urls(collected_urls)
     
     if processed_data:
-        analyzer = OpenRouterAnalyzer(db)
+        analyzer = OpenRouterAnalyzer(db, llm)
         report = await analyzer.analyze_urls(list(processed_data.keys()))
         if report:
             await analyzer.save_report(report)
@@ -218,89 +99,249 @@ def show_progress(step, total_steps, message):
     progress = (step / total_steps) * 100
     print(f"{Fore.CYAN}[{progress:.0f}%] {message}{Style.RESET_ALL}")
 
-async def main():
-    try:
-        show_progress(0, 4, "Starting search...")
+async def search_keywords(keywords):
+    """Return {keyword: valid URLs} with first pages fetched as one batch."""
+    serp_urls = {}
+    async with SerpClient(config, serp_cache) as serp:
+        first_pages = await serp.search_many(keywords)
         
-        response_data = response.json()
-        if not response_data or 'tasks' not in response_data:
-            raise ValueError("Invalid API response format")
-        
-        show_progress(1, 4, "Processing results...")
+        async def collect(keyword):
+            try:
+                urls = await serp.collect_urls(keyword, process_results, limit=10,
+                                               results=first_pages[keyword])
+                serp_urls[keyword] = [url for url in urls if url][:10]
+            except Exception as e:
+                print(f"{Fore.RED}Search failed for '{keyword}': {e}{Style.RESET_ALL}")
         
-        results = response_data['tasks'][0]['result'][0]
-        if not results or 'items' not in results:
-            raise ValueError("No search results found")
+        await asyncio.gather(*[collect(keyword) for keyword in keywords if keyword in first_pages])
+    return serp_urls
+
+def top_up_from_corpus(keywords, serp_urls, limit=10):
+    """Fill keywords with fewer than `limit` SERP URLs from stored pages."""
+    for keyword in keywords:
+        urls = serp_urls.get(keyword, [])
+        if len(urls) >= limit:
+            continue
+        local = [url for url, _, _ in db.search(keyword, limit * 2)
+                 if url not in urls and is_valid_url(url)][:limit - len(urls)]
+        if local:
+            print(f"{Fore.GREEN}Added {len(local)} stored page(s) for '{keyword}' from the local index{Style.RESET_ALL}")
+            serp_urls[keyword] = urls + local
+
+async def scrape_urls(urls_to_scrape):
+    collected = set()
+    
+    # Pages crawled within the re-crawl window are reused instead of fetched again
+    stored = db.fresh_contents(urls_to_scrape, config.recrawl_after)
+    if stored:
+        print(f"{Fore.GREEN}Reusing {len(stored)} stored page(s) crawled in the last "
+              f"{config.recrawl_after}s{Style.RESET_ALL}")
+        collected.update(stored)
+        urls_to_scrape = [url for url in urls_to_scrape if url not in stored]
+    
+    # One thread owns the page cache connection, which keeps its writes in order
+    with ProcessPoolExecutor(max_workers=config.parse_workers, initializer=set_error_phrases,
+                             initargs=(config.error_phrases,)) as pool, \
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix='page-cache') as cache_executor:
+        if duplicates is not None and stored:
+            loop = asyncio.get_running_loop()
+            fingerprints = await asyncio.gather(*[loop.run_in_executor(pool, simhash, content)
+                                                  for content in stored.values()])
+            for url, fingerprint in zip(stored, fingerprints):
+                duplicates.add(url, fingerprint)
         
-        valid_urls = process_results(results['items'])
+        async with AsyncFetcher(config) as fetcher, DatabaseWriter(db, config.db_batch_size) as writer:
+            async def scrape(url):
+                content = await scrape_seo_content(fetcher, pool, cache_executor, url)
+                fingerprint = None
+                if duplicates is not None and content:
+                    loop = asyncio.get_running_loop()
+                    fingerprint = await loop.run_in_executor(pool, simhash, content)
+                return url, content, fingerprint
         
-        show_progress(2, 4, "Checking for additional pages...")
+            # Queue each page for saving as soon as its download finishes
+            saves = {}
+            for task in asyncio.as_completed([scrape(url) for url in urls_to_scrape]):
+                url, content, fingerprint = await task
+                saves[url] = writer.save_page(url, content)
+                if content:
+                    if fingerprint is not None:
+                        duplicates.add(url, fingerprint)
+                    print(f"Collected URL {len(collected) + 1}: {url}")
+                    collected.add(url)
+            
+            results = await asyncio.gather(*saves.values(), return_exceptions=True)
+            for url, result in zip(saves, results):
+                if isinstance(result, Exception):
+                    print(f"{Fore.RED}Error processing {url}: {str(result)}{Style.RESET_ALL}")
+                    collected.discard(url)
+            print(f"{Fore.WHITE}Saved {writer.stats()}{Style.RESET_ALL}")
+    
+    return collected
+
+async def analyze_keyword(llm, keyword, collected_urls, checkpoints):
+    analyzer = OpenRouterAnalyzer(db, llm)
+    report = checkpoints.get('report')
+    if report:
+        print(f"{Fore.GREEN}Resumed finished report for '{keyword}'{Style.RESET_ALL}")
+        await analyzer.save_report(report, keyword, checkpoints.run_id)
+        return
+    
+    final_summary = checkpoints.get('summary')
+    if final_summary:
+        print(f"{Fore.GREEN}Resumed final summary for '{keyword}'{Style.RESET_ALL}")
+    else:
+        print(f"\n{Fore.CYAN}Starting intent-based filtering for '{keyword}'...{Style.RESET_ALL}")
+        intent_agent = IntentAgent(db, llm, checkpoints)
+        intent_agent.set_prompt(keyword)
+        final_summary = await intent_agent.process_urls(collected_urls)
+        if final_summary:
+            checkpoints.save('summary', final_summary)
+    
+    if not final_summary:
+        # Nothing is checkpointed, so a resumed run retries filtering
+        print(f"{Fore.RED}No summary for '{keyword}', skipping analysis{Style.RESET_ALL}")
+        return
+    
+    print(f"\n{Fore.MAGENTA}Preparing final summary for analysis...{Style.RESET_ALL}")
+    print(f"{Fore.WHITE}Summary length: {len(final_summary)} characters{Style.RESET_ALL}")
+    print(f"{Fore.WHITE}Preview:{Style.RESET_ALL}")
+    print(final_summary[:200] + "...")
+    
+    print("\nStarting comprehensive SEO analysis...")
+    
+    # Create a dictionary with a single entry for the final summary
+    summary_data = {"final_summary": final_summary}
+    report = await analyzer.analyze_urls(summary_data)
+    
+    if report:
+        checkpoints.save('report', report)
+        await analyzer.save_report(report, keyword, checkpoints.run_id)
+        print(f"{Fore.GREEN}Comprehensive SEO analysis complete!{Style.RESET_ALL}")
+    else:
+        print(f"{Fore.RED}Failed to generate analysis report{Style.RESET_ALL}")
+
+async def main(keywords, run_id):
+    try:
+        checkpoints = {keyword: RunCheckpoints(db, run_id, keyword) for keyword in keywords}
+        # Keywords whose analysed URLs were saved by an earlier attempt skip search and scraping
+        pending = [keyword for keyword in keywords if checkpoints[keyword].get('urls') is None]
         
-        page = 1
-        while len(valid_urls) < 10 and page < results.get('metrics', {}).get('pagination', {}).get('total', 1):
-            page += 1
-            next_payload = [{
-                "language_code": "en",
-                "location_code": 2840,
-                "keyword": keyword,
-                "page": page
-            }]
-            next_response = requests.post(url, headers=headers, json=next_payload)
-            next_data = next_response.json()
-            if next_data and 'tasks' in next_data:
-                valid_urls += process_results(next_data['tasks'][0]['result'][0]['items'])
+        show_progress(0, 4, "Starting search...")
         
-        show_progress(3, 4, "Processing URLs...")
+        serp_urls = {}
+        for keyword in pending:
+            saved = checkpoints[keyword].get('serp_urls')
+            if saved is not None:
+                serp_urls[keyword] = saved
+        to_search = [keyword for keyword in pending if keyword not in serp_urls]
         
-        collected_urls = []
-        for index, url in enumerate(valid_urls[:10], 1):
-            try:
-                if not url:
-                    continue
-                    
-                url_id = db.save_url(url)
-                
-                if url_id is None:
-                    with db.conn:
-                        url_id = db.conn.execute('SELECT id FROM urls WHERE url = ?', (url,)).fetchone()[0]
-                
-                content = scrape_seo_content(url)
-                if content:
-                    db.save_seo_content(url_id, content)
-                    print(f"Collected URL {index}: {url}")
-                    collected_urls.append(url)
-                
-            except Exception as e:
-                print(f"{Fore.RED}Error processing {url}: {str(e)}{Style.RESET_ALL}")
+        show_progress(1, 4, f"Fetching result pages for {len(to_search)} keyword(s)...")
+        if to_search:
+            found = await search_keywords(to_search)
+            if config.local_search:
+                top_up_from_corpus(to_search, found)
+            for keyword, urls in found.items():
+                checkpoints[keyword].save('serp_urls', urls)
+            serp_urls.update(found)
         
-        show_progress(4, 4, "Search complete!")
+        # A page returned for several keywords is only scraped once
+        urls_to_scrape = list(dict.fromkeys(url for urls in serp_urls.values() for url in urls))
+        show_progress(2, 4, f"Found {len(urls_to_scrape)} unique valid URLs")
         
-        print(f"\n{Fore.CYAN}Starting intent-based filtering...{Style.RESET_ALL}")
-        intent_agent = IntentAgent(db)
-        intent_agent.set_prompt(keyword)
-        final_summary = await intent_agent.process_urls(collected_urls)
+        show_progress(3, 4, "Processing URLs...")
+        collected = await scrape_urls(urls_to_scrape)
         
-        if final_summary:
-            print(f"\n{Fore.MAGENTA}Preparing final summary for analysis...{Style.RESET_ALL}")
-            print(f"{Fore.WHITE}Summary length: {len(final_summary)} characters{Style.RESET_ALL}")
-            print(f"{Fore.WHITE}Preview:{Style.RESET_ALL}")
-            print(final_summary[:200] + "...")
+        for keyword in pending:
+            if keyword not in serp_urls:
+                continue
+            # Keep SERP ranking order for the downstream agents
+            collected_urls = [url for url in serp_urls[keyword] if url in collected]
+            if duplicates is not None:
+                # Only the best ranked page of each near-duplicate cluster is analyzed
+                unique_urls = duplicates.representatives(collected_urls)
+                if len(unique_urls) < len(collected_urls):
+                    print(f"{Fore.YELLOW}Skipping {len(collected_urls) - len(unique_urls)} near-duplicate "
+                          f"page(s) for '{keyword}'{Style.RESET_ALL}")
+                collected_urls = unique_urls
+            checkpoints[keyword].save('urls', collected_urls)
         
-        print("\nStarting comprehensive SEO analysis...")
-        analyzer = OpenRouterAnalyzer(db)
+        show_progress(4, 4, "Search complete!")
         
-        # Create a dictionary with a single entry for the final summary
-        summary_data = {"final_summary": final_summary}
-        report = await analyzer.analyze_urls(summary_data)
+        # One pooled LLM client is shared by every agent in the run
+        async with OpenRouterClient(config, llm_cache) as llm:
+            for keyword in keywords:
+                collected_urls = checkpoints[keyword].get('urls')
+                if collected_urls is None:
+                    continue
+                try:
+                    await analyze_keyword(llm, keyword, collected_urls, checkpoints[keyword])
+                except Exception as e:
+                    print(f"{Fore.RED}Analysis failed for '{keyword}': {e}{Style.RESET_ALL}")
+            
+            print(f"{Fore.WHITE}LLM requests: {llm.scheduler.stats()}{Style.RESET_ALL}")
         
-        if report:
-            await analyzer.save_report(report)
-            print(f"{Fore.GREEN}Comprehensive SEO analysis complete!{Style.RESET_ALL}")
-        else:
-            print(f"{Fore.RED}Failed to generate analysis report{Style.RESET_ALL}")
+        if llm_cache:
+            print(f"{Fore.WHITE}LLM cache: {llm_cache.stats()}{Style.RESET_ALL}")
 
     except Exception as e:
         print(f"{Fore.RED}Error in main workflow: {e}{Style.RESET_ALL}")
+    
+    print(f"{Fore.WHITE}Run {run_id}: rerun with --resume {run_id} to continue from the last finished stage"
+          f"{Style.RESET_ALL}")
+
+def read_keywords(source):
+    """Read one keyword per line from a file, or from stdin when source is '-'."""
+    if source == '-':
+        lines = sys.stdin
+    else:
+        with open(source, encoding='utf-8') as f:
+            lines = f.readlines()
+    return list(dict.fromkeys(line.strip() for line in lines if line.strip()))
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="MoonScrape SERP scraper")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="file with one keyword per line, or '-' to read them from stdin")
+    parser.add_argument('--resume', metavar='RUN_ID', nargs='?', const='',
+                        help="continue a stored run from its first unfinished stage (default: latest run)")
+    args = parser.parse_args()
+
+    # Startup work stays under the main guard so parse workers can import
+    # this module without prompting or resetting the database
+
+    # Show title screen at startup
+    show_title_screen()
+
+    # Initialize database and config
+    config = ConfigManager()
+    db = DatabaseManager(config.db_path, config.db_compression, config.db_dictionary)
+    blacklist = DomainMatcher(config.blacklisted_domains)
+    page_cache = None
+    if config.page_cache_enabled:
+        page_cache = PageCache(config.page_cache_path, config.page_cache_ttl, config.page_cache_max_bytes)
+
+    duplicates = None
+    if config.dedup_enabled:
+        duplicates = NearDuplicateIndex(config.dedup_max_distance)
+
+    serp_cache = SerpCache(config.serp_cache_path, config.serp_cache_ttl, config.serp_offline)
+    llm_cache = None
+    if config.llm_cache_enabled:
+        llm_cache = LlmCache(config.llm_cache_path, config.llm_cache_max_age,
+                             config.llm_cache_max_bytes, config.llm_cache_bypass)
+
+    if args.resume is not None:
+        run_id, keywords = load_run(db, args.resume)
+        if not run_id:
+            print(f"{Fore.RED}No stored run to resume{Style.RESET_ALL}")
+            sys.exit(1)
+        print(f"{Fore.CYAN}Resuming run {run_id} for {len(keywords)} keyword(s){Style.RESET_ALL}")
+    else:
+        if args.batch:
+            keywords = read_keywords(args.batch)
+        else:
+            keywords = [input("Enter search keyword: ").strip()]
+        run_id = start_run(db, keywords)
+    
+    asyncio.run(main(keywords, run_id))
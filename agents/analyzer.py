@@ -1,20 +1,17 @@
 import os
+import re
+import hashlib
 import json
-import aiohttp
 import asyncio
-from config.manager import ConfigManager
 from pathlib import Path
 from colorama import Fore, Style
+from agents.llm_client import OpenRouterClient
 
 class OpenRouterAnalyzer:
-    def __init__(self, db):
-        self.config = ConfigManager()
+    def __init__(self, db, client):
+        self.client = client
+        self.config = client.config
         self.db = db
-        self.base_url = "https://openrouter.ai/api/v1/chat/completions"
-        self.headers = {
-            "Authorization": f"Bearer {self.config.openrouter_api_key}",
-            "Content-Type": "application/json"
-        }
         self.analysis_folder = Path("analysis")
         self.analysis_folder.mkdir(exist_ok=True)
 
@@ -41,21 +38,7 @@ class OpenRouterAnalyzer:
             7. Backlink opportunities
             """
             
-            payload = {
-                "model": self.config.ai_model,
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.2,
-                "max_tokens": 3000
-            }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.base_url, headers=self.headers, json=payload) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data['choices'][0]['message']['content']
-                    else:
-                        error = await response.text()
-                        raise Exception(f"OpenRouter API error: {error}")
+            return await self.client.complete(prompt, temperature=0.2, max_tokens=3000, stage='analysis')
                         
         except Exception as e:
             print(f"{Fore.RED}Error during analysis: {e}{Style.RESET_ALL}")
@@ -65,17 +48,27 @@ class OpenRouterAnalyzer:
         # Implement content retrieval from your database or storage
         pass
 
-    async def save_report(self, report):
-        report_path = self.analysis_folder / "aggregated_analysis.txt"
+    async def save_report(self, report, name=None, run_id=None):
+        # Reports of a run go in their own folder so later runs never overwrite them
+        folder = self.analysis_folder / run_id if run_id else self.analysis_folder
+        folder.mkdir(exist_ok=True)
+        if name:
+            # The hash keeps keywords that only differ in punctuation apart
+            slug = re.sub(r'[^\w]+', '_', name.lower()).strip('_') or 'report'
+            slug = f"{slug[:80]}_{hashlib.sha256(name.encode('utf-8')).hexdigest()[:8]}"
+            report_path = folder / f"{slug}_analysis.txt"
+        else:
+            report_path = folder / "aggregated_analysis.txt"
         with open(report_path, "w", encoding="utf-8") as f:
             f.write(report)
         print(f"{Fore.GREEN}Aggregated report saved to {report_path}{Style.RESET_ALL}")
 
 async def main(urls):
-    analyzer = OpenRouterAnalyzer()
-    report = await analyzer.analyze_urls(urls)
-    if report:
-        await analyzer.save_report(report)
+    async with OpenRouterClient() as client:
+        analyzer = OpenRouterAnalyzer(None, client)
+        report = await analyzer.analyze_urls(urls)
+        if report:
+            await analyzer.save_report(report)
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,73 @@
+import re
+from typing import List
+
+# Rough average for English prose across common tokenizers
+CHARS_PER_TOKEN = 4
+
+HEADING = re.compile(r'^#{1,6} ')
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    return text[:max_tokens * CHARS_PER_TOKEN]
+
+def pack_by_tokens(texts: List[str], budget: int) -> List[List[str]]:
+    """Group texts in order so each group stays within the token budget.
+
+    A text larger than the budget on its own gets a group to itself.
+    """
+    groups = []
+    current = []
+    current_tokens = 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if current and current_tokens + tokens > budget:
+            groups.append(current)
+            current = []
+            current_tokens = 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+def _split_oversized(section: str, max_tokens: int) -> List[str]:
+    # Fall back to paragraphs, then to a hard cut for a single huge paragraph
+    pieces = []
+    for paragraph in section.split('\n\n'):
+        while estimate_tokens(paragraph) > max_tokens:
+            pieces.append(truncate_to_tokens(paragraph, max_tokens))
+            paragraph = paragraph[max_tokens * CHARS_PER_TOKEN:]
+        if paragraph.strip():
+            pieces.append(paragraph)
+    return pieces
+
+def split_markdown(text: str, max_tokens: int) -> List[str]:
+    """Split markdown into chunks of at most max_tokens, cutting at headings.
+
+    Sections that start at a heading are kept whole where possible and
+    packed together in order. Oversized sections are split further at
+    paragraph breaks.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    sections = []
+    current = []
+    for line in text.split('\n'):
+        if HEADING.match(line) and current:
+            sections.append('\n'.join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append('\n'.join(current))
+
+    pieces = []
+    for section in sections:
+        if estimate_tokens(section) > max_tokens:
+            pieces.extend(_split_oversized(section, max_tokens))
+        else:
+            pieces.append(section)
+
+    return ['\n\n'.join(group) for group in pack_by_tokens(pieces, max_tokens)]
@@ -1,21 +1,49 @@
 import re
-import aiohttp
 import asyncio
 from typing import List, Dict
 from colorama import Fore, Style
-from config.manager import ConfigManager
+from agents.chunker import split_markdown
 
 class ContentProcessor:
-    def __init__(self, db):
+    def __init__(self, db, client):
         self.db = db
-        self.config = ConfigManager()
-        self.base_url = "https://openrouter.ai/api/v1/chat/completions"
-        self.headers = {
-            "Authorization": f"Bearer {self.config.openrouter_api_key}",
-            "Content-Type": "application/json"
-        }
+        self.client = client
+        self.config = client.config
 
     async def extract_key_points(self, content: str) -> str:
+        # Oversized pages are analysed chunk by chunk (map) and combined (reduce)
+        chunks = split_markdown(content, self.config.chunk_tokens)
+        if len(chunks) == 1:
+            return await self._extract_chunk(content)
+        
+        print(f"{Fore.CYAN}Large page split into {len(chunks)} chunks{Style.RESET_ALL}")
+        partials = [p for p in await asyncio.gather(*[self._extract_chunk(chunk) for chunk in chunks]) if p]
+        if len(partials) <= 1:
+            return partials[0] if partials else None
+        
+        combined = "\n\n---\n\n".join(partials)
+        prompt = f"""
+        Act as an SEO Content Specialist. These are partial analyses of different sections of one page:
+        {combined}
+        
+        Combine them into a single analysis of the whole page. Merge duplicated keywords
+        and suggestions, and keep exactly the same output format:
+        
+        ### Main Topic
+        ### Keywords
+        ### Structure Analysis
+        ### SEO Suggestions
+        ### Content Gaps
+        ### Engagement
+        """
+        
+        try:
+            return await self.client.complete(prompt, temperature=0.2, max_tokens=10000, stage='content')
+        except Exception as e:
+            print(f"{Fore.RED}AI extraction error: {e}{Style.RESET_ALL}")
+            return "\n\n".join(partials)
+
+    async def _extract_chunk(self, content: str) -> str:
         prompt = f"""
         Act as an SEO Content Specialist and analyze this content:
         {content}
@@ -54,22 +82,11 @@ class ContentProcessor:
         [Engagement strategy suggestions]
         """
         
-        payload = {
-            "model": self.config.ai_model,
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.2,
-            "max_tokens": 10000
-        }
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.base_url, headers=self.headers, json=payload) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data['choices'][0]['message']['content']
-                else:
-                    error = await response.text()
-                    print(f"{Fore.RED}AI extraction error: {error}{Style.RESET_ALL}")
-                    return None
+        try:
+            return await self.client.complete(prompt, temperature=0.2, max_tokens=10000, stage='content')
+        except Exception as e:
+            print(f"{Fore.RED}AI extraction error: {e}{Style.RESET_ALL}")
+            return None
 
     async def process_urls(self, urls: List[str]) -> Dict[str, str]:
         processed_data = {}
@@ -83,9 +100,10 @@ class ContentProcessor:
                                    JOIN urls ON seo_content.url_id = urls.id 
                                    WHERE urls.url = ?''', (url,))
                     result = cursor.fetchone()
+                    content = self.db.read_content(result[0]) if result else None
                     
-                    if result and result[0] and not result[0].startswith("Error:"):
-                        key_points = await self.extract_key_points(result[0])
+                    if content and not content.startswith("Error:"):
+                        key_points = await self.extract_key_points(content)
                         if key_points:
                             processed_data[url] = key_points
                             print(f"{Fore.GREEN}Processed: {url}{Style.RESET_ALL}")
@@ -1,19 +1,16 @@
-import aiohttp
 import asyncio
 from typing import List, Dict
 from colorama import Fore, Style
-from config.manager import ConfigManager
 from datetime import datetime
+from agents.chunker import estimate_tokens, pack_by_tokens, truncate_to_tokens, split_markdown
+from agents.relevance import prefilter_pages
 
 class IntentAgent:
-    def __init__(self, db):
+    def __init__(self, db, client, checkpoints=None):
         self.db = db
-        self.config = ConfigManager()
-        self.base_url = "https://openrouter.ai/api/v1/chat/completions"
-        self.headers = {
-            "Authorization": f"Bearer {self.config.openrouter_api_key}",
-            "Content-Type": "application/json"
-        }
+        self.client = client
+        self.config = client.config
+        self.checkpoints = checkpoints
         self.user_prompt = None
 
     def set_prompt(self, prompt: str):
@@ -60,6 +57,23 @@ class IntentAgent:
         print(f"{Fore.MAGENTA}Intent analysis:{Style.RESET_ALL}")
         print(intent_analysis)
         
+        # Oversized pages are filtered chunk by chunk (map) and merged (reduce)
+        chunks = split_markdown(content, self.config.chunk_tokens)
+        if len(chunks) > 1:
+            print(f"{Fore.CYAN}Large page split into {len(chunks)} chunks{Style.RESET_ALL}")
+        
+        results = await asyncio.gather(*[self._filter_chunk(intent_analysis, chunk) for chunk in chunks])
+        if len(results) == 1:
+            return results[0]
+        
+        relevant = [result for result in results if result and result != 'No relevant content found']
+        if not relevant:
+            return 'No relevant content found' if any(results) else None
+        if len(relevant) == 1:
+            return relevant[0]
+        return await self._merge_sections(relevant)
+
+    async def _filter_chunk(self, intent_analysis: str, content: str) -> str:
         prompt = f"""
         {intent_analysis}
         
@@ -80,56 +94,104 @@ class IntentAgent:
         If no relevant content is found, return 'No relevant content found'.
         """
         
-        payload = {
-            "model": self.config.ai_model,
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.2,
-            "max_tokens": 5000
-        }
+        try:
+            return await self.client.complete(prompt, temperature=0.2, max_tokens=5000,
+                                              stop_on='No relevant content found', stage='filter')
+        except Exception as e:
+            print(f"{Fore.RED}AI filtering error: {e}{Style.RESET_ALL}")
+            return None
+
+    async def _merge_sections(self, sections: List[str]) -> str:
+        content = "\n\n---\n\n".join(sections)
+        prompt = f"""
+        These sections were extracted from different parts of one page for the query: {self.user_prompt}
+        
+        {content}
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.base_url, headers=self.headers, json=payload) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data['choices'][0]['message']['content']
-                else:
-                    error = await response.text()
-                    print(f"{Fore.RED}AI filtering error: {error}{Style.RESET_ALL}")
-                    return None
+        Merge them into a single markdown document with clear section headers.
+        Remove duplicated points but keep every citation, statistic, quote and source reference.
+        """
+        
+        try:
+            return await self.client.complete(prompt, temperature=0.2, max_tokens=5000, stage='filter')
+        except Exception as e:
+            print(f"{Fore.RED}Merging filtered sections failed: {e}{Style.RESET_ALL}")
+            return "\n\n".join(sections)
 
-    async def process_urls(self, urls: List[str]) -> Dict[str, str]:
-        processed_data = {}
-        total_urls = len(urls)
+    def _load_contents(self, urls: List[str]) -> Dict[str, str]:
+        """Read the stored content of every URL up front in one query."""
+        contents = {}
+        if not urls:
+            return contents
         
+        placeholders = ','.join('?' * len(urls))
         with self.db.conn:
-            cursor = self.db.conn.cursor()
-            
-            for i, url in enumerate(urls, 1):
-                try:
-                    print(f"\n{Fore.BLUE}[{i}/{total_urls}] Processing URL: {url}{Style.RESET_ALL}")
+            rows = self.db.conn.execute(f'''SELECT urls.url, seo_content.content FROM seo_content 
+                                           JOIN urls ON seo_content.url_id = urls.id 
+                                           WHERE urls.url IN ({placeholders})
+                                           ORDER BY seo_content.id''', urls).fetchall()
+        # Content is stored compressed and only decoded for the rows kept
+        for url, content in rows:
+            if url not in contents:
+                contents[url] = self.db.read_content(content)
+        return contents
+
+    async def _filter_url(self, semaphore, i, total_urls, url, content):
+        # '' marks a page already found to have nothing relevant
+        saved = self.checkpoints.get('filtered', url) if self.checkpoints else None
+        if saved is not None:
+            print(f"{Fore.GREEN}[{i}/{total_urls}] Resumed filtered content for {url}{Style.RESET_ALL}")
+            return saved or None
+        
+        result = await self._filter_page(semaphore, i, total_urls, url, content)
+        if self.checkpoints and result is not None:
+            self.checkpoints.save('filtered', result if result != 'No relevant content found' else '', url)
+        return result if result != 'No relevant content found' else None
+
+    async def _filter_page(self, semaphore, i, total_urls, url, content):
+        async with semaphore:
+            try:
+                print(f"\n{Fore.BLUE}[{i}/{total_urls}] Processing URL: {url}{Style.RESET_ALL}")
+                
+                if content and not content.startswith("Error:"):
+                    print(f"{Fore.CYAN}🔍 Filtering content for: '{self.user_prompt}'{Style.RESET_ALL}")
+                    print(f"{Fore.WHITE}Content size: {len(content)} characters{Style.RESET_ALL}")
                     
-                    cursor.execute('''SELECT content FROM seo_content 
-                                   JOIN urls ON seo_content.url_id = urls.id 
-                                   WHERE urls.url = ?''', (url,))
-                    result = cursor.fetchone()
+                    relevant_content = await self.filter_relevant_content(content)
                     
-                    if result and result[0] and not result[0].startswith("Error:"):
-                        print(f"{Fore.CYAN}🔍 Filtering content for: '{self.user_prompt}'{Style.RESET_ALL}")
-                        print(f"{Fore.WHITE}Content size: {len(result[0])} characters{Style.RESET_ALL}")
-                        
-                        relevant_content = await self.filter_relevant_content(result[0])
-                        
-                        if relevant_content and relevant_content != 'No relevant content found':
-                            processed_data[url] = relevant_content
-                            print(f"{Fore.GREEN}✅ Found {len(relevant_content.splitlines())} relevant sections{Style.RESET_ALL}")
-                            print(f"{Fore.WHITE}Relevant content size: {len(relevant_content)} characters{Style.RESET_ALL}")
-                        else:
-                            print(f"{Fore.YELLOW}⚠️ No content matches the search intent{Style.RESET_ALL}")
+                    if relevant_content and relevant_content != 'No relevant content found':
+                        print(f"{Fore.GREEN}✅ [{i}/{total_urls}] Found {len(relevant_content.splitlines())} relevant sections{Style.RESET_ALL}")
+                        print(f"{Fore.WHITE}Relevant content size: {len(relevant_content)} characters{Style.RESET_ALL}")
+                        return relevant_content
                     else:
-                        print(f"{Fore.RED}❌ Invalid content - cannot process{Style.RESET_ALL}")
-                        
-                except Exception as e:
-                    print(f"{Fore.RED}❌ Processing failed: {str(e)}{Style.RESET_ALL}")
+                        print(f"{Fore.YELLOW}⚠️ [{i}/{total_urls}] No content matches the search intent{Style.RESET_ALL}")
+                        # None when filtering failed, the sentinel when the page had nothing relevant
+                        return relevant_content
+                else:
+                    print(f"{Fore.RED}❌ [{i}/{total_urls}] Invalid content - cannot process{Style.RESET_ALL}")
+                    
+            except Exception as e:
+                print(f"{Fore.RED}❌ [{i}/{total_urls}] Processing failed: {str(e)}{Style.RESET_ALL}")
+            return None
+
+    async def process_urls(self, urls: List[str]) -> Dict[str, str]:
+        total_urls = len(urls)
+        contents = self._load_contents(urls)
+        
+        # Cut pages down to their best matching sections before any LLM call
+        if self.config.prefilter_enabled and self.user_prompt:
+            before = sum(estimate_tokens(content) for content in contents.values() if content)
+            contents = prefilter_pages(contents, self.user_prompt, self.config.prefilter_tokens)
+            after = sum(estimate_tokens(content) for content in contents.values() if content)
+            print(f"{Fore.CYAN}Lexical pre-filter: ~{before} -> ~{after} tokens across {len(contents)} pages{Style.RESET_ALL}")
+        
+        # Filter pages concurrently, results are kept in the original URL order
+        semaphore = asyncio.Semaphore(self.config.intent_concurrency)
+        results = await asyncio.gather(*[
+            self._filter_url(semaphore, i, total_urls, url, contents.get(url))
+            for i, url in enumerate(urls, 1)
+        ])
+        processed_data = {url: result for url, result in zip(urls, results) if result}
         
         print(f"\n{Fore.GREEN}🎉 URL analysis complete!{Style.RESET_ALL}")
         print(f"{Fore.WHITE}Processed {total_urls} URLs, found relevant content in {len(processed_data)} URLs{Style.RESET_ALL}")
@@ -137,7 +199,16 @@ class IntentAgent:
         # Now process the final summary with epochs
         if processed_data:
             print(f"\n{Fore.CYAN}Starting final summary with 5 epochs...{Style.RESET_ALL}")
-            combined_content = "\n\n".join(processed_data.values())
+            if self.config.summary_mode == 'cumulative':
+                digest = "\n\n".join(processed_data.values())
+            else:
+                digest = self.checkpoints.get('digest') if self.checkpoints else None
+                if digest is None:
+                    digest = await self._build_digest(list(processed_data.values()))
+                    if self.checkpoints:
+                        self.checkpoints.save('digest', digest)
+            combined_content = digest
+            total_prompt_tokens = 0
             best_summary = None
             best_score = 0
             
@@ -183,38 +254,46 @@ class IntentAgent:
                 [Citations and references]
                 """
                 
-                payload = {
-                    "model": self.config.ai_model,
-                    "messages": [{"role": "user", "content": summary_prompt}],
-                    "temperature": 0.3 + (epoch * 0.05),  # Gradually increase creativity
-                    "max_tokens": 5000
-                }
+                prompt_tokens = estimate_tokens(summary_prompt)
+                total_prompt_tokens += prompt_tokens
+                print(f"{Fore.WHITE}Prompt size: ~{prompt_tokens} tokens{Style.RESET_ALL}")
+                
+                summary = self.checkpoints.get('epoch', str(epoch)) if self.checkpoints else None
+                if summary is not None:
+                    print(f"{Fore.GREEN}Resumed epoch {epoch} summary{Style.RESET_ALL}")
+                else:
+                    try:
+                        # Gradually increase creativity
+                        summary = await self.client.complete(summary_prompt, temperature=0.3 + (epoch * 0.05),
+                                                             max_tokens=5000, stage='summary')
+                    except Exception as e:
+                        print(f"{Fore.RED}Epoch {epoch} failed: {e}{Style.RESET_ALL}")
+                        continue
+                    if self.checkpoints:
+                        self.checkpoints.save('epoch', summary, str(epoch))
+                
+                score = self._evaluate_summary_quality(summary, epoch)
+                print(f"{Fore.WHITE}Epoch {epoch} quality score: {score:.2f}{Style.RESET_ALL}")
+                
+                if score > best_score:
+                    best_summary = summary
+                    best_score = score
+                    print(f"{Fore.GREEN}New best summary found!{Style.RESET_ALL}")
+                
+                print(f"{Fore.YELLOW}Epoch {epoch} summary preview:{Style.RESET_ALL}")
+                print(summary[:200] + "...")
+                
+                if self.config.summary_mode == 'cumulative':
+                    combined_content = f"{combined_content}\n\n### Previous Summary\n{summary}"
+                else:
+                    # Only the latest summary is carried forward, so prompts stay the same size
+                    combined_content = f"{digest}\n\n### Previous Summary\n{summary}"
                 
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(self.base_url, headers=self.headers, json=payload) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            summary = data['choices'][0]['message']['content']
-                            
-                            score = self._evaluate_summary_quality(summary, epoch)
-                            print(f"{Fore.WHITE}Epoch {epoch} quality score: {score:.2f}{Style.RESET_ALL}")
-                            
-                            if score > best_score:
-                                best_summary = summary
-                                best_score = score
-                                print(f"{Fore.GREEN}New best summary found!{Style.RESET_ALL}")
-                            
-                            print(f"{Fore.YELLOW}Epoch {epoch} summary preview:{Style.RESET_ALL}")
-                            print(summary[:200] + "...")
-                            
-                            combined_content = f"{combined_content}\n\n### Previous Summary\n{summary}"
-                            
-                            if score == 1.0:
-                                print(f"{Fore.GREEN}Perfect score achieved, stopping epochs early{Style.RESET_ALL}")
-                                break
-                        else:
-                            error = await response.text()
-                            print(f"{Fore.RED}Epoch {epoch} failed: {error}{Style.RESET_ALL}")
+                if score == 1.0:
+                    print(f"{Fore.GREEN}Perfect score achieved, stopping epochs early{Style.RESET_ALL}")
+                    break
+            
+            print(f"{Fore.WHITE}Summary prompts used ~{total_prompt_tokens} tokens in total{Style.RESET_ALL}")
             
             if best_summary:
                 print(f"\n{Fore.GREEN}Final summary complete! Best score: {best_score:.2f}{Style.RESET_ALL}")
@@ -226,6 +305,42 @@ class IntentAgent:
             print(f"{Fore.YELLOW}No relevant content found for summary{Style.RESET_ALL}")
             return None
 
+    async def _condense(self, texts: List[str], max_tokens: int) -> str:
+        content = "\n\n---\n\n".join(texts)
+        prompt = f"""
+        Condense the following filtered content about: {self.user_prompt}
+        
+        {content}
+        
+        Keep every concrete fact, figure, date, quote and source reference.
+        Drop repetition and filler. Format as markdown with clear section headers.
+        """
+        try:
+            return await self.client.complete(prompt, temperature=0.2, max_tokens=max_tokens, stage='summary')
+        except Exception as e:
+            print(f"{Fore.RED}Condensing failed: {e}{Style.RESET_ALL}")
+            return truncate_to_tokens("\n\n".join(texts), max_tokens)
+
+    async def _build_digest(self, contents: List[str]) -> str:
+        """Reduce per-URL content to a digest within summary_token_budget.
+
+        Content that already fits is used as is. Otherwise it is packed into
+        budget-sized groups that are condensed concurrently (map), and the
+        condensed parts are packed and condensed again until the whole digest
+        fits (reduce).
+        """
+        budget = self.config.summary_token_budget
+        for round_number in range(1, 4):
+            if estimate_tokens("\n\n".join(contents)) <= budget:
+                break
+            groups = pack_by_tokens(contents, budget)
+            share = max(budget // len(groups), 256)
+            print(f"{Fore.CYAN}Condensing {len(contents)} parts into {len(groups)} "
+                  f"(round {round_number}, ~{share} tokens each)...{Style.RESET_ALL}")
+            contents = await asyncio.gather(*[self._condense(group, share) for group in groups])
+        
+        return truncate_to_tokens("\n\n".join(contents), budget)
+
     def _evaluate_summary_quality(self, summary: str, epoch: int) -> float:
         score = 0.0
         
@@ -0,0 +1,176 @@
+import asyncio
+import json
+import aiohttp
+from colorama import Fore, Style
+from agents.chunker import estimate_tokens
+from agents.scheduler import RequestScheduler, RetryableError, RETRY_STATUSES, parse_retry_after
+from config.manager import ConfigManager
+
+# A stop sentinel only ends a stream when it shows up this early in the reply
+SENTINEL_WINDOW = 200
+
+class OpenRouterClient:
+    """Shared OpenRouter chat-completions client for one run.
+
+    All agents send their requests through one pooled session, so TCP and
+    TLS handshakes happen once per connection instead of once per call.
+    Requests go through a RequestScheduler, so rate limits and transient
+    server errors are retried instead of dropping the result.
+    """
+
+    base_url = "https://openrouter.ai/api/v1/chat/completions"
+
+    def __init__(self, config=None, cache=None):
+        self.config = config or ConfigManager()
+        self.cache = cache
+        self.headers = {
+            "Authorization": f"Bearer {self.config.openrouter_api_key}",
+            "Content-Type": "application/json"
+        }
+        self.session = None
+        self.scheduler = RequestScheduler(
+            self.config.llm_max_connections,
+            max_retries=self.config.llm_max_retries,
+            base_delay=self.config.llm_retry_base_delay,
+            max_delay=self.config.llm_retry_max_delay
+        )
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.config.llm_max_connections,
+            ttl_dns_cache=300,
+            keepalive_timeout=60
+        )
+        timeout = aiohttp.ClientTimeout(total=self.config.llm_timeout)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout, headers=self.headers)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+
+    async def complete(self, prompt, temperature, max_tokens, model=None, stop_on=None, token_budget=None,
+                       stage=None):
+        """Send a single-message chat completion and return its text, or raise.
+
+        The model is picked per pipeline stage from the config. If a model
+        still fails after retries, the next one in the stage's fallback list
+        is tried. Identical requests are answered from the response cache
+        when one is configured. With streaming enabled, a reply that opens
+        with the stop_on sentinel returns the sentinel at once, and
+        generation is cut off after token_budget tokens (stream_token_budget
+        by default).
+        """
+        models = [model] if model else self.config.models_for(stage)
+        for i, candidate in enumerate(models):
+            try:
+                return await self._complete(candidate, prompt, temperature, max_tokens, stop_on, token_budget)
+            except Exception as e:
+                if i == len(models) - 1:
+                    raise
+                print(f"{Fore.YELLOW}{candidate} failed ({e}), falling back to {models[i + 1]}{Style.RESET_ALL}")
+
+    async def _complete(self, model, prompt, temperature, max_tokens, stop_on, token_budget):
+        key = None
+        if self.cache:
+            key = self.cache.make_key(model, prompt, temperature, max_tokens)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        payload = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+
+        truncated = False
+        if self.config.llm_stream:
+            payload["stream"] = True
+            if token_budget is None:
+                token_budget = self.config.stream_token_budget
+            content, truncated = await self.scheduler.run(lambda: self._stream(payload, stop_on, token_budget))
+        else:
+            content = await self.scheduler.run(lambda: self._post(payload))
+
+        # A reply cut at the token budget is not what the full request would return
+        if self.cache and content and not truncated:
+            self.cache.store(key, model, content)
+        return content
+
+    @staticmethod
+    def _raise_error(error, retry_after=None):
+        # OpenRouter also reports upstream failures inside a 200 body
+        code = error.get('code') if isinstance(error, dict) else None
+        if code in RETRY_STATUSES:
+            raise RetryableError(f"OpenRouter error {code}: {error.get('message', error)}", retry_after)
+        raise Exception(f"OpenRouter API error: {error}")
+
+    async def _check_status(self, response):
+        if response.status == 200:
+            return
+        error = await response.text()
+        if response.status in RETRY_STATUSES:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            raise RetryableError(f"OpenRouter HTTP {response.status}", retry_after)
+        raise Exception(f"OpenRouter API error: {error}")
+
+    async def _post(self, payload):
+        try:
+            async with self.session.post(self.base_url, json=payload) as response:
+                await self._check_status(response)
+                data = await response.json()
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            raise RetryableError(f"OpenRouter connection error: {e!r}")
+        if 'error' in data:
+            self._raise_error(data['error'])
+        return data['choices'][0]['message']['content']
+
+    async def _stream(self, payload, stop_on, token_budget):
+        try:
+            return await self._read_stream(payload, stop_on, token_budget)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            raise RetryableError(f"OpenRouter connection error: {e!r}")
+
+    async def _read_stream(self, payload, stop_on, token_budget):
+        """Read a server-sent event stream, returning (text, truncated)."""
+        parts = []
+        text = ''
+        truncated = False
+        echo = self.config.stream_echo
+        async with self.session.post(self.base_url, json=payload) as response:
+            await self._check_status(response)
+
+            async for line in response.content:
+                line = line.decode('utf-8').strip()
+                # Blank lines separate events and ':' lines are keep-alive comments
+                if not line.startswith('data:'):
+                    continue
+                data = line[5:].strip()
+                if data == '[DONE]':
+                    break
+                event = json.loads(data)
+                if 'error' in event:
+                    self._raise_error(event['error'])
+                delta = (event.get('choices') or [{}])[0].get('delta', {}).get('content')
+                if not delta:
+                    continue
+
+                parts.append(delta)
+                if echo:
+                    print(f"{Style.DIM}{delta}{Style.RESET_ALL}", end='', flush=True)
+                text = ''.join(parts)
+
+                # Closing the response drops the connection so the provider stops generating
+                if stop_on and len(text) <= SENTINEL_WINDOW + len(stop_on) and stop_on.lower() in text.lower():
+                    response.close()
+                    text = stop_on
+                    break
+                if token_budget and estimate_tokens(text) >= token_budget:
+                    response.close()
+                    truncated = True
+                    break
+
+        if echo and parts:
+            print()
+        return text, truncated
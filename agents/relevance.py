@@ -0,0 +1,114 @@
+import re
+from typing import Dict, List
+import numpy as np
+from agents.chunker import HEADING, estimate_tokens, truncate_to_tokens
+
+TOKEN = re.compile(r'\w+')
+
+# Standard Okapi BM25 parameters
+K1 = 1.5
+B = 0.75
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN.findall(text.lower())
+
+def split_sections(text: str) -> List[str]:
+    """Split markdown into paragraphs, keeping headings with the paragraph after them."""
+    sections = []
+    headings = []
+    for block in text.split('\n\n'):
+        block = block.strip()
+        if not block:
+            continue
+        if HEADING.match(block) and '\n' not in block:
+            headings.append(block)
+            continue
+        sections.append('\n\n'.join(headings + [block]))
+        headings = []
+    if headings:
+        sections.append('\n\n'.join(headings))
+    return sections
+
+def bm25_scores(sections: List[str], query: str, k1: float = K1, b: float = B) -> np.ndarray:
+    """Score every section against the query with Okapi BM25.
+
+    Term frequencies for all sections are counted in one pass over a flat
+    array of (section, term) ids, so document frequencies and length
+    normalisation come from the whole corpus at once.
+    """
+    scores = np.zeros(len(sections))
+    query_terms = sorted(set(tokenize(query)))
+    if not sections or not query_terms:
+        return scores
+
+    tokenized = [tokenize(section) for section in sections]
+    lengths = np.array([len(tokens) for tokens in tokenized], dtype=np.float64)
+    if not lengths.any():
+        return scores
+    section_ids = np.repeat(np.arange(len(sections)), lengths.astype(np.int64))
+    tokens = np.array([token for tokens in tokenized for token in tokens])
+
+    # Column of each token in the sorted query terms, masked to real matches
+    query = np.array(query_terms)
+    columns = np.searchsorted(query, tokens)
+    columns[columns == len(query)] = 0
+    hits = query[columns] == tokens
+
+    tf = np.zeros((len(sections), len(query)))
+    np.add.at(tf, (section_ids[hits], columns[hits]), 1)
+
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log(1 + (len(sections) - df + 0.5) / (df + 0.5))
+    norm = k1 * (1 - b + b * lengths / lengths.mean())
+    scores = (tf * (k1 + 1) / (tf + norm[:, None])) @ idf
+    return scores
+
+def select_sections(sections: List[str], scores: np.ndarray, token_budget: int) -> str:
+    """Join the best scoring sections that fit the budget, in page order.
+
+    Sections that share no term with the query are never picked. If none
+    match at all, the start of the page is kept so the LLM still decides.
+    """
+    if not (scores > 0).any():
+        return truncate_to_tokens('\n\n'.join(sections), token_budget)
+
+    chosen = []
+    used = 0
+    for index in np.argsort(-scores, kind='stable'):
+        if scores[index] <= 0:
+            break
+        tokens = estimate_tokens(sections[index])
+        if used + tokens > token_budget:
+            continue
+        chosen.append(index)
+        used += tokens
+    if not chosen:
+        # Even the best section is over budget on its own
+        best = int(np.argmax(scores))
+        return truncate_to_tokens(sections[best], token_budget)
+    return '\n\n'.join(sections[index] for index in sorted(chosen))
+
+def prefilter_pages(contents: Dict[str, str], query: str, token_budget: int) -> Dict[str, str]:
+    """Reduce every page to its sections most relevant to the query.
+
+    All pages are scored together as one corpus, so terms that appear in
+    every section of every page count for little. Pages already within
+    the budget are returned unchanged.
+    """
+    filtered = dict(contents)
+    oversized = [url for url, content in contents.items()
+                 if content and estimate_tokens(content) > token_budget]
+    if not oversized:
+        return filtered
+
+    pages = {url: split_sections(content) for url, content in contents.items() if content}
+    corpus = [section for sections in pages.values() for section in sections]
+    scores = bm25_scores(corpus, query)
+
+    offset = 0
+    for url, sections in pages.items():
+        if url in oversized:
+            page_scores = scores[offset:offset + len(sections)]
+            filtered[url] = select_sections(sections, page_scores, token_budget)
+        offset += len(sections)
+    return filtered
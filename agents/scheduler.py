@@ -0,0 +1,113 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from colorama import Fore, Style
+
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+class RetryableError(Exception):
+    """A request failed in a way worth retrying, e.g. HTTP 429 or 503."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+class RequestScheduler:
+    """Runs LLM requests under an adaptive concurrency window.
+
+    The window grows by about one slot per window of successful requests
+    and halves when the provider throttles (additive increase,
+    multiplicative decrease), so throughput settles just under the
+    provider's limit. A throttled request is retried after the server's
+    Retry-After, which also pauses every other request, or after a
+    jittered exponential backoff when no Retry-After is given.
+    """
+
+    def __init__(self, max_concurrency, max_retries=5, base_delay=1.0, max_delay=60.0):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.generation = 0
+        self.resume_at = 0.0
+        self.condition = asyncio.Condition()
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+
+    async def _acquire(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            generation = self.generation
+        delay = self.resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return generation
+
+    async def _release(self, generation, throttled=None):
+        async with self.condition:
+            self.in_flight -= 1
+            if throttled:
+                # Requests sent before the last decrease saw the old window,
+                # so a burst of 429s only halves it once
+                if generation == self.generation:
+                    self.limit = max(1.0, self.limit / 2)
+                    self.generation += 1
+            elif throttled is False:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+    def _backoff(self, attempt, retry_after):
+        if retry_after is not None:
+            # A little jitter keeps paused requests from resuming in lockstep
+            return retry_after + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    async def run(self, send):
+        """Await send() under the window, retrying on RetryableError."""
+        self.requests += 1
+        for attempt in range(self.max_retries + 1):
+            generation = await self._acquire()
+            try:
+                result = await send()
+            except RetryableError as e:
+                await self._release(generation, throttled=True)
+                if attempt == self.max_retries:
+                    self.failures += 1
+                    raise Exception(f"{e} (gave up after {attempt + 1} attempts)")
+                delay = self._backoff(attempt, e.retry_after)
+                if e.retry_after is not None:
+                    self.resume_at = max(self.resume_at, time.monotonic() + delay)
+                self.retries += 1
+                print(f"{Fore.YELLOW}{e}, retrying in {delay:.1f}s "
+                      f"(attempt {attempt + 1}/{self.max_retries}, window {int(self.limit)}){Style.RESET_ALL}")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException as e:
+                await self._release(generation)
+                if not isinstance(e, asyncio.CancelledError):
+                    self.failures += 1
+                raise
+            await self._release(generation, throttled=False)
+            return result
+
+    def stats(self):
+        return (f"{self.requests} requests, {self.retries} retries, {self.failures} failed, "
+                f"window {int(self.limit)}/{self.max_concurrency}")
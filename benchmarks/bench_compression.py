@@ -0,0 +1,91 @@
+"""Storage size of seo_content with each compression method.
+
+Usage:
+    python -m benchmarks.bench_compression [db ...]
+
+Each scraped_urls_*.db under data/ (or the databases given) is copied to
+a temporary directory and never modified in place. Every copy is
+migrated by DatabaseManager with zlib and with zstd, vacuumed and
+measured. All pages are then pooled into one database to show what a
+trained zstd dictionary adds once there are enough pages to train on.
+Sizes are the raw markdown, the stored content values and the database
+file on disk. Decoding time is per page.
+"""
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from colorama import init, Fore, Style
+from storage.database_manager import DatabaseManager
+
+init()
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+def measure(path, compression, use_dictionary=False):
+    db = DatabaseManager(path, compression, use_dictionary)
+    if use_dictionary and db.codec.dict_id is None:
+        print(f"{Fore.YELLOW}Not enough pages to train a dictionary for {path.name}{Style.RESET_ALL}")
+    # Rows already migrated by an earlier run keep their encoding until rewritten
+    with db.conn:
+        db.recompress()
+    values = [content for content, in db.conn.execute('SELECT content FROM seo_content')]
+    stored = sum(len(value) if isinstance(value, bytes) else len(value.encode('utf-8')) for value in values)
+    start = time.perf_counter()
+    raw = sum(len(db.read_content(value).encode('utf-8')) for value in values)
+    decode_us = (time.perf_counter() - start) / max(len(values), 1) * 1e6
+    db.conn.execute('VACUUM')
+    db.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    db.conn.close()
+    return len(values), raw, stored, path.stat().st_size, decode_us
+
+def report(name, compression, original, row):
+    pages, raw, stored, on_disk, decode_us = row
+    ratio = raw / stored if stored else 0.0
+    print(f"{name:32} {compression:9} {pages:5} {raw / 1024:9.1f} {stored / 1024:9.1f} {ratio:6.2f}x "
+          f"{original / 1024:9.1f} {on_disk / 1024:9.1f} {decode_us:8.1f}")
+
+def pooled_copy(db_paths, path):
+    db = DatabaseManager(path, 'none')
+    pages = []
+    for db_path in db_paths:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        pages += [(f"{db_path.stem}/{url}", content) for url, content in conn.execute(
+            'SELECT urls.url, seo_content.content FROM seo_content JOIN urls ON seo_content.url_id = urls.id')]
+        conn.close()
+    db.save_pages([(url, content) for url, content in pages if content])
+    db.conn.execute('VACUUM')
+    db.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    db.conn.close()
+
+def main(db_paths):
+    print(f"{'database':32} {'method':9} {'pages':>5} {'raw KB':>9} {'stored KB':>9} {'ratio':>7} "
+          f"{'file KB':>9} {'after KB':>9} {'us/page':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for db_path in db_paths:
+            conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+            empty = not conn.execute('SELECT 1 FROM seo_content LIMIT 1').fetchone()
+            conn.close()
+            if empty:
+                continue
+            for compression in ('zlib', 'zstd'):
+                copy = tmp / f"{db_path.stem}-{compression}.db"
+                shutil.copy(db_path, copy)
+                report(db_path.stem, compression, db_path.stat().st_size, measure(copy, compression))
+
+        pooled = tmp / "pooled.db"
+        pooled_copy(db_paths, pooled)
+        original = pooled.stat().st_size
+        print(f"\n{Fore.CYAN}All corpora pooled into one database{Style.RESET_ALL}")
+        for compression, use_dictionary in (('none', False), ('zlib', False), ('zstd', False), ('zstd', True)):
+            copy = tmp / f"pooled-{compression}-{use_dictionary}.db"
+            shutil.copy(pooled, copy)
+            label = 'zstd+dict' if use_dictionary else compression
+            report("pooled", label, original, measure(copy, compression, use_dictionary))
+
+if __name__ == "__main__":
+    paths = [Path(arg) for arg in sys.argv[1:]] or sorted(DATA_DIR.glob("scraped_urls_*.db"))
+    main(paths)
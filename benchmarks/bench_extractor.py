@@ -0,0 +1,65 @@
+"""Micro-benchmark for the single-pass HTML-to-markdown extractor.
+
+Usage:
+    python -m benchmarks.bench_extractor [pages_dir]
+
+Every *.html file in pages_dir (default: benchmarks/pages) is timed as a
+saved corpus page. No pages ship with the repository; save a few result
+pages there first (e.g. with curl -o), otherwise that part is skipped.
+A synthetic page is then grown in size to show that
+extraction time per node stays flat, i.e. the extractor scales linearly.
+"""
+import sys
+import time
+from pathlib import Path
+from colorama import init, Fore, Style
+from scraper.extractor import html_to_markdown
+
+init()
+
+def time_call(func, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def synthetic_page(items):
+    sections = []
+    for i in range(items // 10):
+        list_items = ''.join(f"<li>Item {i}-{j} with <b>bold</b> text</li>" for j in range(5))
+        sections.append(
+            f"<h2>Section {i}</h2><p>Paragraph {i} with <a href='#'>a link</a>.</p>"
+            f"<ul>{list_items}</ul><ol>{list_items}</ol><blockquote>Quote {i}</blockquote>"
+        )
+    return f"<html><body><h1>Docs</h1>{''.join(sections)}</body></html>"
+
+def bench_corpus(pages_dir):
+    pages = sorted(pages_dir.glob("*.html"))
+    if not pages:
+        print(f"{Fore.YELLOW}No saved pages in {pages_dir}, skipping corpus run{Style.RESET_ALL}")
+        return
+
+    print(f"{Fore.CYAN}Corpus: {len(pages)} pages from {pages_dir}{Style.RESET_ALL}")
+    total = 0.0
+    for page in pages:
+        html = page.read_text(encoding="utf-8", errors="replace")
+        elapsed = time_call(html_to_markdown, html)
+        total += elapsed
+        print(f"{page.name:40} {len(html) / 1024:8.1f} KB {elapsed * 1000:8.2f} ms")
+    print(f"{Fore.GREEN}Total: {total * 1000:.2f} ms{Style.RESET_ALL}\n")
+
+def bench_scaling():
+    print(f"{Fore.CYAN}Scaling on synthetic pages{Style.RESET_ALL}")
+    print(f"{'items':>8} {'KB':>8} {'ms':>10} {'us/item':>10}")
+    for items in (1000, 2000, 4000, 8000, 16000, 32000):
+        html = synthetic_page(items)
+        elapsed = time_call(html_to_markdown, html)
+        print(f"{items:8} {len(html) / 1024:8.1f} {elapsed * 1000:10.2f} {elapsed / items * 1e6:10.2f}")
+
+if __name__ == "__main__":
+    pages_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent / "pages"
+    bench_corpus(pages_dir)
+    bench_scaling()
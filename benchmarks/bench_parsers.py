@@ -0,0 +1,82 @@
+"""Side-by-side benchmark of the HTML parser backends.
+
+Usage:
+    python -m benchmarks.bench_parsers [pages_dir]
+
+Each backend runs in its own process over the same pages (saved *.html
+files from pages_dir, or synthetic pages when none are found) and reports
+per-page parse time, peak Python heap (tracemalloc) and peak RSS growth.
+RSS is the only figure that includes memory held by C parsers and is
+left out on platforms without the resource module.
+"""
+import sys
+import time
+import tracemalloc
+from multiprocessing import Pipe, Process
+from pathlib import Path
+from colorama import init, Fore, Style
+from scraper.extractor import html_to_markdown
+from scraper.parsers import BACKENDS
+from benchmarks.bench_extractor import synthetic_page
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+init()
+
+def load_pages(pages_dir):
+    pages = [(page.name, page.read_text(encoding="utf-8", errors="replace"))
+             for page in sorted(pages_dir.glob("*.html"))]
+    if not pages:
+        pages = [(f"synthetic-{items}", synthetic_page(items)) for items in (500, 2000, 8000)]
+    return pages
+
+def run_backend(backend, pages, conn):
+    # Warm up so imports are not counted as parse memory
+    html_to_markdown("<html><body><p>warm up</p></body></html>", backend)
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+
+    times = []
+    for _, html in pages:
+        start = time.perf_counter()
+        html_to_markdown(html, backend)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    for _, html in pages:
+        html_to_markdown(html, backend)
+    heap_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    rss_growth = None
+    if resource:
+        rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss
+    conn.send((times, heap_peak, rss_growth))
+    conn.close()
+
+def main(pages_dir):
+    pages = load_pages(pages_dir)
+    results = {}
+    for backend in BACKENDS:
+        parent, child = Pipe()
+        process = Process(target=run_backend, args=(backend, pages, child))
+        process.start()
+        results[backend] = parent.recv()
+        process.join()
+
+    print(f"{Fore.CYAN}Per-page parse time (ms){Style.RESET_ALL}")
+    print(f"{'page':32} {'KB':>8}" + ''.join(f" {backend:>12}" for backend in results))
+    for i, (name, html) in enumerate(pages):
+        row = ''.join(f" {results[backend][0][i] * 1000:12.2f}" for backend in results)
+        print(f"{name[:32]:32} {len(html) / 1024:8.1f}{row}")
+
+    print(f"\n{Fore.CYAN}Memory{Style.RESET_ALL}")
+    print(f"{'backend':12} {'total ms':>10} {'heap peak KB':>14} {'rss growth KB':>14}")
+    for backend, (times, heap_peak, rss_growth) in results.items():
+        rss = f"{rss_growth:14}" if rss_growth is not None else f"{'n/a':>14}"
+        print(f"{backend:12} {sum(times) * 1000:10.2f} {heap_peak / 1024:14.1f} {rss}")
+
+if __name__ == "__main__":
+    main(Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent / "pages")
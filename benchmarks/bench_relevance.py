@@ -0,0 +1,96 @@
+"""Benchmark for the lexical BM25 pre-filter run before the LLM stages.
+
+Usage:
+    python -m benchmarks.bench_relevance [--budget TOKENS] [--query TEXT] [db ...]
+
+Every scraped_urls_*.db under data/ (or the databases given) is opened
+read-only and its pages are pre-filtered as one corpus, the way
+IntentAgent does before calling the LLM. The run reports prompt tokens
+before and after, and the time spent scoring. The stored pages are then
+repeated to show how scoring time grows with corpus size.
+"""
+import argparse
+import sqlite3
+from pathlib import Path
+from colorama import init, Fore, Style
+from agents.chunker import estimate_tokens
+from agents.relevance import bm25_scores, prefilter_pages, split_sections
+from benchmarks.bench_extractor import time_call
+
+init()
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Keywords the sample corpora were scraped for
+QUERIES = {
+    "scraped_urls_20250224101354": "who is the current president of the united states",
+    "scraped_urls_20250224101605": "list of us presidents",
+    "scraped_urls_20250224103626": "why did the uswnt lose the 2023 women's world cup",
+    "scraped_urls_20250224105751": "starship flight test 4 results",
+}
+DEFAULT_QUERY = "latest news"
+
+def load_pages(db_path):
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute('''SELECT urls.url, seo_content.content FROM seo_content
+                               JOIN urls ON seo_content.url_id = urls.id
+                               ORDER BY seo_content.id''').fetchall()
+    finally:
+        conn.close()
+    pages = {}
+    for url, content in rows:
+        if content and not content.startswith("Error:"):
+            pages.setdefault(url, content)
+    return pages
+
+def tokens_of(pages):
+    return sum(estimate_tokens(content) for content in pages.values())
+
+def bench_corpora(db_paths, budget, query):
+    print(f"{Fore.CYAN}Pre-filter at {budget} tokens per page{Style.RESET_ALL}")
+    print(f"{'corpus':32} {'pages':>6} {'before':>9} {'after':>9} {'ratio':>7} {'ms':>9}")
+    corpus = {}
+    total_before = total_after = 0
+    for db_path in db_paths:
+        pages = load_pages(db_path)
+        if not pages:
+            continue
+        keyword = query or QUERIES.get(db_path.stem, DEFAULT_QUERY)
+        elapsed = time_call(prefilter_pages, pages, keyword, budget)
+        filtered = prefilter_pages(pages, keyword, budget)
+        before, after = tokens_of(pages), tokens_of(filtered)
+        total_before += before
+        total_after += after
+        print(f"{db_path.stem:32} {len(pages):6} {before:9} {after:9} "
+              f"{before / max(after, 1):6.1f}x {elapsed * 1000:9.2f}")
+        corpus.update((f"{db_path.stem}/{url}", content) for url, content in pages.items())
+
+    if not corpus:
+        print(f"{Fore.YELLOW}No stored pages found, nothing to benchmark{Style.RESET_ALL}")
+        return corpus
+    print(f"{Fore.GREEN}Total: ~{total_before} -> ~{total_after} prompt tokens "
+          f"({total_before / max(total_after, 1):.1f}x fewer){Style.RESET_ALL}\n")
+    return corpus
+
+def bench_scaling(corpus, query):
+    sections = [section for content in corpus.values() for section in split_sections(content)]
+    keyword = query or DEFAULT_QUERY
+    print(f"{Fore.CYAN}BM25 scoring time as the corpus grows{Style.RESET_ALL}")
+    print(f"{'copies':>8} {'sections':>10} {'ms':>10} {'us/section':>12}")
+    for copies in (1, 2, 4, 8, 16):
+        grown = sections * copies
+        elapsed = time_call(bm25_scores, grown, keyword)
+        print(f"{copies:8} {len(grown):10} {elapsed * 1000:10.2f} {elapsed / len(grown) * 1e6:12.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the BM25 pre-filter on stored corpora")
+    parser.add_argument("--budget", type=int, default=1500, help="Token budget per page")
+    parser.add_argument("--query", help="Keyword to score against instead of each corpus' own")
+    parser.add_argument("databases", nargs="*", type=Path, help="Databases to read (default: data/*.db)")
+    args = parser.parse_args()
+
+    db_paths = args.databases or sorted(DATA_DIR.glob("scraped_urls_*.db"))
+    corpus = bench_corpora(db_paths, args.budget, args.query)
+    if corpus:
+        bench_scaling(corpus, args.query)
@@ -0,0 +1,60 @@
+"""Throughput of the LLM request scheduler against a throttling provider.
+
+Usage:
+    python -m benchmarks.bench_scheduler [requests] [max_concurrent]
+
+A FakeOpenRouter that only serves max_concurrent requests at once (and
+fails a few with 503) is started locally. The same burst of completions
+is sent through OpenRouterClient twice: once without retries, which is
+how the agents used to behave, and once with the adaptive scheduler. Each
+run reports wall time, completed requests and how many were lost.
+"""
+import asyncio
+import sys
+import time
+from colorama import init, Fore, Style
+from agents.llm_client import OpenRouterClient
+from benchmarks.fake_openrouter import FakeOpenRouter
+from config.manager import ConfigManager
+
+init()
+
+async def run_burst(url, requests, max_retries, server):
+    config = ConfigManager()
+    config.llm_stream = False
+    config.llm_max_retries = max_retries
+    config.llm_retry_base_delay = 0.2
+    OpenRouterClient.base_url = url
+
+    async def one(i):
+        try:
+            return await llm.complete(f"request {i}", temperature=0.2, max_tokens=100)
+        except Exception:
+            return None
+
+    throttled, errors = server.throttled, server.errors
+    start = time.perf_counter()
+    async with OpenRouterClient(config) as llm:
+        results = await asyncio.gather(*[one(i) for i in range(requests)])
+        stats = llm.scheduler.stats()
+    elapsed = time.perf_counter() - start
+    done = sum(1 for result in results if result)
+    print(f"{'retries ' + str(max_retries):12} {elapsed:8.2f} s {done:6}/{requests} ok "
+          f"{requests - done:5} lost {server.throttled - throttled:6} x 429 "
+          f"{server.errors - errors:4} x 503")
+    print(f"{Fore.WHITE}  scheduler: {stats}{Style.RESET_ALL}")
+
+async def main(requests, max_concurrent):
+    server = FakeOpenRouter(max_concurrent=max_concurrent, latency=0.2, error_rate=0.05)
+    url = await server.start(8799)
+    print(f"{Fore.CYAN}{requests} requests, provider serves {max_concurrent} at once{Style.RESET_ALL}")
+    try:
+        await run_burst(url, requests, 0, server)
+        await run_burst(url, requests, 5, server)
+    finally:
+        await server.stop()
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    max_concurrent = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    asyncio.run(main(requests, max_concurrent))
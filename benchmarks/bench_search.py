@@ -0,0 +1,71 @@
+"""Query latency of the local full-text index as the corpus grows.
+
+Usage:
+    python -m benchmarks.bench_search [max_pages]
+
+The pages of the data/*.db samples (opened read-only) are copied into a
+temporary database under new URLs until it holds max_pages pages
+(default 6000). At each size, every sample keyword is searched through
+DatabaseManager.search, including snippet extraction. The median and
+worst latency are reported with the write time per page, which includes
+keeping the index in sync.
+"""
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from colorama import init, Fore, Style
+from storage.database_manager import DatabaseManager
+from benchmarks.bench_relevance import DATA_DIR, QUERIES, load_pages
+
+init()
+
+REPEAT = 5
+
+def sample_pages():
+    pages = []
+    for db_path in sorted(DATA_DIR.glob("scraped_urls_*.db")):
+        pages += [(f"{db_path.stem}/{url}", content) for url, content in load_pages(db_path).items()]
+    return pages
+
+def time_queries(db):
+    latencies = []
+    for query in QUERIES.values():
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            db.search(query, 10)
+            latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies), max(latencies)
+
+def main(max_pages):
+    pages = sample_pages()
+    if not pages:
+        print(f"{Fore.YELLOW}No stored pages found in {DATA_DIR}{Style.RESET_ALL}")
+        return
+
+    print(f"{Fore.CYAN}{len(pages)} sample pages, {len(QUERIES)} queries x {REPEAT}{Style.RESET_ALL}")
+    print(f"{'pages':>8} {'write ms/page':>14} {'median ms':>10} {'max ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(Path(tmp) / "search.db", 'zstd')
+        stored = 0
+        copy = 0
+        size = len(pages)
+        while size <= max_pages:
+            batch = []
+            while stored + len(batch) < size:
+                url, content = pages[len(batch) % len(pages)]
+                batch.append((f"{url}#{copy}-{len(batch)}", content))
+            copy += 1
+            start = time.perf_counter()
+            db.save_pages(batch)
+            write_ms = (time.perf_counter() - start) / max(len(batch), 1) * 1000
+            stored += len(batch)
+
+            median, worst = time_queries(db)
+            print(f"{stored:8} {write_ms:14.2f} {median * 1000:10.2f} {worst * 1000:10.2f}")
+            size *= 4
+        db.conn.close()
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 6000)
@@ -0,0 +1,111 @@
+"""Local stand-in for the OpenRouter chat-completions endpoint.
+
+Usage:
+    python -m benchmarks.fake_openrouter [--port 8790] [--max-concurrent 4]
+                                         [--latency 0.2] [--error-rate 0.05]
+
+Requests over max_concurrent get a 429 with a Retry-After header, and a
+share of the rest fail with a 503, the way a busy provider behaves. Both
+plain and streamed (stream: true) completions are supported. `statuses`
+scripts the error status of the next requests (e.g. [429, 503]), which
+the scheduler tests use to get a known sequence of failures. Point
+OpenRouterClient.base_url at http://127.0.0.1:<port>/api/v1/chat/completions
+to run the pipeline against it.
+"""
+import argparse
+import asyncio
+import json
+import random
+from aiohttp import web
+
+PATH = "/api/v1/chat/completions"
+
+class FakeOpenRouter:
+    def __init__(self, max_concurrent=4, latency=0.2, error_rate=0.05, retry_after=1, statuses=None):
+        self.max_concurrent = max_concurrent
+        self.latency = latency
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.statuses = list(statuses or [])
+        self.active = 0
+        self.served = 0
+        self.throttled = 0
+        self.errors = 0
+        self.runner = None
+
+    def reply_for(self, prompt):
+        if "No relevant content" in prompt and "NONE" in prompt:
+            return "No relevant content found"
+        return f"Echo: {prompt.strip()[-80:]}"
+
+    async def handle(self, request):
+        payload = await request.json()
+        if self.statuses:
+            status = self.statuses.pop(0)
+            if status == 429:
+                return self._throttle()
+            self.errors += 1
+            return web.json_response({"error": {"code": status, "message": "Scripted error"}}, status=status)
+        if self.active >= self.max_concurrent:
+            return self._throttle()
+        if random.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({"error": {"code": 503, "message": "Provider overloaded"}}, status=503)
+
+        self.active += 1
+        try:
+            reply = self.reply_for(payload["messages"][0]["content"])
+            if payload.get("stream"):
+                return await self._stream(request, reply)
+            await asyncio.sleep(self.latency)
+            self.served += 1
+            return web.json_response({"choices": [{"message": {"role": "assistant", "content": reply}}]})
+        finally:
+            self.active -= 1
+
+    def _throttle(self):
+        self.throttled += 1
+        return web.json_response({"error": {"code": 429, "message": "Rate limit exceeded"}},
+                                 status=429, headers={"Retry-After": str(self.retry_after)})
+
+    async def _stream(self, request, reply):
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        await response.write(b": OPENROUTER PROCESSING\n\n")
+        words = reply.split(" ")
+        for i, word in enumerate(words):
+            await asyncio.sleep(self.latency / len(words))
+            delta = word if i == 0 else f" {word}"
+            event = {"choices": [{"delta": {"content": delta}}]}
+            await response.write(f"data: {json.dumps(event)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        self.served += 1
+        return response
+
+    async def start(self, port=8790):
+        app = web.Application()
+        app.router.add_post(PATH, self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", port).start()
+        return f"http://127.0.0.1:{port}{PATH}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+async def serve(args):
+    server = FakeOpenRouter(args.max_concurrent, args.latency, args.error_rate)
+    url = await server.start(args.port)
+    print(f"Fake OpenRouter listening on {url}")
+    await asyncio.Event().wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a fake OpenRouter endpoint")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--max-concurrent", type=int, default=4, help="Requests served at once before 429s")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per completion")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="Share of requests failing with 503")
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
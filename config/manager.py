@@ -1,5 +1,6 @@
 import json
 from pathlib import Path
+from scraper.matcher import DEFAULT_BLACKLISTED_DOMAINS, DEFAULT_ERROR_PHRASES
 
 class ConfigManager:
     def __init__(self):
@@ -12,4 +13,81 @@ class ConfigManager:
         self.email = config['email']
         self.api_key = config['api_key']
         self.openrouter_api_key = config.get('openrouter', {}).get('api_key', '')
-        self.ai_model = config.get('openrouter', {}).get('ai_model', 'x-ai/grok-2-1212') 
\ No newline at end of file
+        self.ai_model = config.get('openrouter', {}).get('ai_model', 'x-ai/grok-2-1212')
+        self.stage_models = config.get('openrouter', {}).get('models', {})
+        self.llm_timeout = config.get('openrouter', {}).get('timeout', 300)
+        self.llm_max_connections = config.get('openrouter', {}).get('max_connections', 10)
+        self.llm_max_retries = config.get('openrouter', {}).get('max_retries', 5)
+        self.llm_retry_base_delay = config.get('openrouter', {}).get('retry_base_delay', 1.0)
+        self.llm_retry_max_delay = config.get('openrouter', {}).get('retry_max_delay', 60.0)
+        self.intent_concurrency = config.get('openrouter', {}).get('intent_concurrency', 5)
+        self.summary_mode = config.get('openrouter', {}).get('summary_mode', 'bounded')
+        self.summary_token_budget = config.get('openrouter', {}).get('summary_token_budget', 12000)
+        self.chunk_tokens = config.get('openrouter', {}).get('chunk_tokens', 6000)
+        self.llm_stream = config.get('openrouter', {}).get('stream', False)
+        self.stream_echo = config.get('openrouter', {}).get('stream_echo', True)
+        self.stream_token_budget = config.get('openrouter', {}).get('stream_token_budget', 0)
+        
+        scraper = config.get('scraper', {})
+        self.max_concurrency = scraper.get('max_concurrency', 10)
+        self.per_host_limit = scraper.get('per_host_limit', 2)
+        self.request_timeout = scraper.get('timeout', 15)
+        self.parse_workers = scraper.get('parse_workers')
+        self.parser_backend = scraper.get('parser_backend', 'lxml')
+        self.max_bytes = scraper.get('max_bytes', 2 * 1024 * 1024)
+        
+        filters = config.get('filters', {})
+        self.blacklisted_domains = self._load_list(filters, 'blacklisted_domains', DEFAULT_BLACKLISTED_DOMAINS)
+        self.error_phrases = self._load_list(filters, 'error_phrases', DEFAULT_ERROR_PHRASES)
+        
+        serp = config.get('serp', {})
+        self.language_code = serp.get('language_code', 'en')
+        self.location_code = serp.get('location_code', 2840)  # United States
+        self.serp_cache_path = serp.get('cache_path', 'data/serp_cache.db')
+        self.serp_cache_ttl = serp.get('cache_ttl', 86400)
+        self.serp_offline = serp.get('offline', False)
+        self.serp_prefetch_pages = serp.get('prefetch_pages', 3)
+        self.serp_batch_size = serp.get('batch_size', 100)
+        
+        database = config.get('database', {})
+        self.db_path = database.get('path', 'data/scraped_urls.db')
+        self.recrawl_after = database.get('recrawl_after', 86400)
+        self.db_batch_size = database.get('batch_size', 100)
+        self.db_compression = database.get('compression', 'zlib')
+        self.db_dictionary = database.get('zstd_dictionary', False)
+        self.local_search = database.get('local_search', True)
+        
+        llm_cache = config.get('llm_cache', {})
+        self.llm_cache_enabled = llm_cache.get('enabled', True)
+        self.llm_cache_path = llm_cache.get('path', 'data/llm_cache.db')
+        self.llm_cache_max_age = llm_cache.get('max_age', 7 * 86400)
+        self.llm_cache_max_bytes = llm_cache.get('max_bytes', 128 * 1024 * 1024)
+        self.llm_cache_bypass = llm_cache.get('bypass', False)
+        
+        prefilter = config.get('prefilter', {})
+        self.prefilter_enabled = prefilter.get('enabled', True)
+        self.prefilter_tokens = prefilter.get('token_budget', 1500)
+        
+        dedup = config.get('dedup', {})
+        self.dedup_enabled = dedup.get('enabled', True)
+        self.dedup_max_distance = dedup.get('max_distance', 3)
+        
+        page_cache = config.get('page_cache', {})
+        self.page_cache_enabled = page_cache.get('enabled', True)
+        self.page_cache_path = page_cache.get('path', 'data/page_cache.db')
+        self.page_cache_ttl = page_cache.get('ttl', 86400)
+        self.page_cache_max_bytes = page_cache.get('max_bytes', 256 * 1024 * 1024)
+        
+    def models_for(self, stage):
+        """Ordered model fallback list for a pipeline stage, ai_model if unset."""
+        models = self.stage_models.get(stage) or [self.ai_model]
+        return [models] if isinstance(models, str) else list(models)
+        
+    def _load_list(self, section, key, default):
+        # Long lists can live in a text file, one entry per line
+        values = list(section.get(key, default))
+        list_file = section.get(f'{key}_file')
+        if list_file:
+            with open(list_file, encoding='utf-8') as f:
+                values += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        return values 
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""Near-duplicate detection for extracted pages.
+
+Each page gets a 64-bit SimHash of its word shingles. Pages whose
+fingerprints differ in at most max_distance bits count as near-duplicates.
+Candidate pairs are found with LSH banding: the fingerprint is cut into
+max_distance + 1 bands, and any two fingerprints that close must share at
+least one band exactly. Adding a page only looks at its own buckets, so
+indexing n pages stays O(n) unless most of them really are duplicates.
+"""
+import hashlib
+import re
+from typing import Dict, List
+import numpy as np
+
+WORD = re.compile(r'\w+')
+SHINGLE_SIZE = 3
+FINGERPRINT_BITS = 64
+BIT_MASKS = np.uint64(1) << np.arange(FINGERPRINT_BITS, dtype=np.uint64)
+
+def _shingle_hash(shingle):
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def simhash(text: str) -> int:
+    words = WORD.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        shingles = [' '.join(words)] if words else []
+    else:
+        shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    if not shingles:
+        return 0
+
+    hashes = np.fromiter((_shingle_hash(shingle) for shingle in shingles), dtype=np.uint64)
+    # Each shingle votes +1 or -1 on every bit, the majority sets the bit
+    votes = np.count_nonzero(hashes[:, None] & BIT_MASKS, axis=0) * 2 - len(hashes)
+    return int(np.sum(BIT_MASKS[votes > 0], dtype=np.uint64))
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+class NearDuplicateIndex:
+    """Clusters pages by SimHash as they are saved.
+
+    Clusters are kept in a union-find over URLs, so a page close to two
+    existing clusters joins them into one.
+    """
+
+    def __init__(self, max_distance=3):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        self.band_bits = FINGERPRINT_BITS // bands
+        self.bands = bands
+        self.fingerprints = {}
+        self.buckets = [{} for _ in range(bands)]
+        self.parent = {}
+
+    def _band_keys(self, fingerprint):
+        mask = (1 << self.band_bits) - 1
+        for band in range(self.bands):
+            # The last band takes any bits left over by the division
+            if band == self.bands - 1:
+                yield fingerprint >> (band * self.band_bits)
+            else:
+                yield (fingerprint >> (band * self.band_bits)) & mask
+
+    def _find(self, url):
+        root = url
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[url] != root:
+            self.parent[url], url = root, self.parent[url]
+        return root
+
+    def add(self, url: str, fingerprint: int):
+        """Index a page's SimHash and merge it into any cluster it is close to."""
+        if url in self.fingerprints:
+            return
+        self.fingerprints[url] = fingerprint
+        self.parent[url] = url
+
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            bucket = self.buckets[band].setdefault(key, [])
+            for other in bucket:
+                if (self._find(other) != self._find(url)
+                        and hamming_distance(fingerprint, self.fingerprints[other]) <= self.max_distance):
+                    self.parent[self._find(other)] = self._find(url)
+            bucket.append(url)
+
+    def clusters(self, urls: List[str]) -> Dict[str, List[str]]:
+        """Group urls by cluster, keyed on the first url of each group."""
+        groups = {}
+        roots = {}
+        for url in urls:
+            if url not in self.parent:
+                groups[url] = [url]
+                continue
+            root = self._find(url)
+            representative = roots.setdefault(root, url)
+            groups.setdefault(representative, []).append(url)
+        return groups
+
+    def representatives(self, urls: List[str]) -> List[str]:
+        """Keep the first url of every cluster, in the given order."""
+        return list(self.clusters(urls))
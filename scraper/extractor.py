@@ -0,0 +1,195 @@
+import re
+import codecs
+import chardet
+from scraper.parsers import get_backend, DEFAULT_BACKEND
+from scraper.matcher import PhraseMatcher, DEFAULT_ERROR_PHRASES
+
+STRIP_TAGS = {'script', 'style', 'nav', 'footer', 'header', 'aside',
+              'form', 'iframe', 'button', 'noscript', 'meta', 'link'}
+
+HEADINGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+BLOCK_TAGS = HEADINGS | {'p', 'li', 'blockquote'}
+LIST_TAGS = {'ul', 'ol'}
+LANDMARK_TAGS = {'article', 'main'}
+
+# Charset sniffing only looks at the start of the page
+CHARSET_SNIFF_BYTES = 64 * 1024
+META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+error_matcher = PhraseMatcher(DEFAULT_ERROR_PHRASES)
+
+def set_error_phrases(phrases):
+    """Compile the soft-error phrases once per worker process."""
+    global error_matcher
+    error_matcher = PhraseMatcher(phrases)
+
+class MarkdownBuilder:
+    """Turns a stream of start/end/data events into markdown in one pass.
+
+    Heading, list and blockquote state is tracked as the events arrive, so
+    every node is visited once no matter how long the lists are. Content
+    starts at the first top-level heading (h1 before h2 and so on), falling
+    back to the first article/main element and then to the body. Stripped
+    tags (scripts, navigation, footers...) are skipped along with their
+    children in the same pass.
+    """
+
+    def __init__(self):
+        self.fragments = []
+        self.lists = []
+        self.block = None
+        self.block_depth = 0
+        self.continuation = False
+        self.parts = []
+        self.pending = []
+        self.skip_depth = 0
+        self.first_heading = {}
+        self.landmark_start = None
+        self.saw_body = False
+
+    def start(self, tag, attrib=None):
+        if self.skip_depth or tag in STRIP_TAGS:
+            # Text on either side of a stripped tag stays separate words
+            self._flush_text()
+            self.skip_depth += 1
+            return
+
+        self._flush_text()
+        parent_depth = None
+        if self.block:
+            if tag in LIST_TAGS and self.block == 'li':
+                # A nested list ends the text of its parent item so far; the
+                # item is reopened when the nested list closes
+                parent_depth = self.block_depth
+                self._close_block()
+            else:
+                if tag in HEADINGS:
+                    # A heading inside a block (e.g. a card in a list) can still start the content
+                    self.first_heading.setdefault(int(tag[1]), len(self.fragments))
+                self.block_depth += 1
+                return
+
+        if tag in LIST_TAGS:
+            self.lists.append([tag, 0, parent_depth])
+        elif tag in BLOCK_TAGS:
+            if tag in HEADINGS:
+                self.first_heading.setdefault(int(tag[1]), len(self.fragments))
+            elif tag == 'li' and self.lists:
+                self.lists[-1][1] += 1
+            self.block = tag
+            self.block_depth = 0
+            self.parts = []
+        elif tag in LANDMARK_TAGS and self.landmark_start is None:
+            self.landmark_start = len(self.fragments)
+        elif tag == 'body':
+            self.saw_body = True
+
+    def end(self, tag):
+        if self.skip_depth:
+            self.skip_depth -= 1
+            return
+
+        self._flush_text()
+        if self.block:
+            if self.block_depth:
+                self.block_depth -= 1
+            else:
+                self._close_block()
+        elif tag in LIST_TAGS and self.lists:
+            parent_depth = self.lists.pop()[2]
+            if parent_depth is not None:
+                # Text after a nested list still belongs to the parent item
+                self.block = 'li'
+                self.block_depth = parent_depth
+                self.continuation = True
+                self.parts = []
+
+    def data(self, text):
+        if self.block and not self.skip_depth:
+            self.pending.append(text)
+
+    def _flush_text(self):
+        # Parsers may split one text node into several data events
+        if self.pending:
+            text = ''.join(self.pending).strip()
+            self.pending = []
+            if text:
+                self.parts.append(text)
+
+    def _close_block(self):
+        tag = self.block
+        text = ' '.join(self.parts)
+        continuation = self.continuation
+        self.block = None
+        self.continuation = False
+        self.parts = []
+        if not text:
+            return
+
+        if tag in HEADINGS:
+            self.fragments.append(f"\n{'#' * int(tag[1])} {text}\n\n")
+        elif tag == 'p':
+            self.fragments.append(f"{text}\n\n")
+        elif tag == 'li':
+            if continuation:
+                self.fragments.append(f"  {text}\n")
+            elif self.lists and self.lists[-1][0] == 'ol':
+                self.fragments.append(f"{self.lists[-1][1]}. {text}\n")
+            else:
+                self.fragments.append(f"- {text}\n")
+        elif tag == 'blockquote':
+            self.fragments.append(f"> {text}\n\n")
+
+    def close(self):
+        self._flush_text()
+        if self.block:
+            self._close_block()
+
+        if self.first_heading:
+            start = self.first_heading[min(self.first_heading)]
+        elif self.landmark_start is not None:
+            start = self.landmark_start
+        elif self.saw_body:
+            start = 0
+        else:
+            return None
+
+        formatted = '\n'.join(self.fragments[start:])
+        formatted = re.sub(r'\n{3,}', '\n\n', formatted)
+        return formatted.strip()
+
+def html_to_markdown(content, backend=DEFAULT_BACKEND):
+    builder = MarkdownBuilder()
+    get_backend(backend)(content, builder)
+    return builder.close()
+
+def detect_encoding(content_type, body):
+    if 'charset=' in content_type:
+        encoding = content_type.split('charset=')[-1].split(';')[0].strip(' "\'')
+    else:
+        head = body[:CHARSET_SNIFF_BYTES]
+        match = META_CHARSET.search(head)
+        if match:
+            encoding = match.group(1).decode('ascii')
+        else:
+            detected = chardet.detect(head)
+            encoding = detected['encoding'] if detected['confidence'] > 0.9 else 'utf-8'
+
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        encoding = 'utf-8'
+    return encoding
+
+def extract_seo_content(content_type, body, backend=DEFAULT_BACKEND):
+    encoding = detect_encoding(content_type, body)
+
+    try:
+        content = body.decode(encoding, errors='strict')
+    except UnicodeDecodeError:
+        content = body.decode(encoding, errors='replace')
+
+    if error_matcher.search(content):
+        return None
+
+    return html_to_markdown(content, backend)
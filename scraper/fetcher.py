@@ -0,0 +1,89 @@
+import asyncio
+import random
+from collections import namedtuple
+import aiohttp
+from colorama import Fore, Style
+
+# Configure stealth headers
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15',
+    'Mozilla/5.0 (X11; Linux x86_64; rv:89.0) Gecko/20100101 Firefox/89.0'
+]
+
+RETRY_STATUSES = {500, 502, 503, 504}
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+HTML_TYPES = ('text/html', 'application/xhtml+xml')
+CHUNK_SIZE = 64 * 1024
+
+FetchResult = namedtuple('FetchResult', ['status', 'content_type', 'body', 'etag', 'last_modified'])
+
+class AsyncFetcher:
+    """Shared aiohttp session for page downloads.
+
+    The connector bounds total and per-host connections, keeps them alive
+    between requests and caches DNS lookups, so a batch of pages costs
+    roughly the slowest page instead of the sum of all of them.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.config.max_concurrency,
+            limit_per_host=self.config.per_host_limit,
+            ttl_dns_cache=300,
+            keepalive_timeout=30
+        )
+        timeout = aiohttp.ClientTimeout(total=self.config.request_timeout)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+
+    async def fetch(self, url, etag=None, last_modified=None):
+        """Download a page and return a FetchResult or raise.
+
+        Passing the validators of a cached copy makes this a conditional GET;
+        a 304 comes back as a FetchResult with an empty body. Non-HTML
+        responses are rejected from their headers before any of the body is
+        read, and the body is streamed and cut off at max_bytes.
+        """
+        headers = {'User-Agent': random.choice(USER_AGENTS)}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        for attempt in range(MAX_RETRIES + 1):
+            async with self.session.get(url, headers=headers) as response:
+                if response.status in RETRY_STATUSES and attempt < MAX_RETRIES:
+                    print(f"{Fore.YELLOW}Retrying {url} after HTTP {response.status}{Style.RESET_ALL}")
+                    await asyncio.sleep(BACKOFF_FACTOR * (2 ** attempt))
+                    continue
+
+                response.raise_for_status()
+                content_type = response.headers.get('content-type', '')
+                validators = (response.headers.get('etag'), response.headers.get('last-modified'))
+                if response.status == 304:
+                    return FetchResult(304, content_type, b'', *validators)
+
+                if content_type and not content_type.lower().startswith(HTML_TYPES):
+                    raise ValueError(f"Skipping non-HTML content ({content_type})")
+
+                body = await self._read_capped(url, response)
+                return FetchResult(response.status, content_type, body, *validators)
+
+    async def _read_capped(self, url, response):
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            body.extend(chunk)
+            if len(body) >= self.config.max_bytes:
+                print(f"{Fore.YELLOW}Truncating {url} at {self.config.max_bytes} bytes{Style.RESET_ALL}")
+                del body[self.config.max_bytes:]
+                break
+        return bytes(body)
@@ -0,0 +1,100 @@
+"""Compiled matchers for the domain blacklist and soft-error phrases.
+
+Both are built once from config and then answer in a single pass, so the
+lists can grow to thousands of entries without slowing down each URL or
+page.
+"""
+import re
+from urllib.parse import urlsplit
+
+DEFAULT_BLACKLISTED_DOMAINS = [
+    'reddit.com',
+    'youtube.com',
+    'vimeo.com',
+    'tiktok.com',
+    'twitter.com',
+    'facebook.com',
+    'instagram.com',
+    'quora.com',
+    'pinterest.com'
+]
+
+DEFAULT_ERROR_PHRASES = [
+    'technical difficulties',
+    'please try again',
+    'forbidden',
+    'access denied',
+    'unavailable',
+    'error occurred',
+    'we\'re sorry',
+    'temporarily unavailable'
+]
+
+class DomainMatcher:
+    """Hostname-suffix trie over reversed domain labels.
+
+    'reddit.com' blocks reddit.com and any subdomain of it, but not
+    notreddit.com or reddit.com.example. A lookup walks at most as many
+    nodes as the hostname has labels.
+    """
+
+    END = object()
+
+    def __init__(self, domains):
+        self.root = {}
+        for domain in domains:
+            node = self.root
+            for label in reversed(domain.strip().lower().strip('.').split('.')):
+                node = node.setdefault(label, {})
+            node[self.END] = True
+
+    def matches_host(self, host):
+        node = self.root
+        for label in reversed(host.lower().rstrip('.').split('.')):
+            node = node.get(label)
+            if node is None:
+                return False
+            if self.END in node:
+                return True
+        return False
+
+    def matches(self, url):
+        host = urlsplit(url if '//' in url else f'//{url}').hostname
+        return bool(host) and self.matches_host(host)
+
+class PhraseMatcher:
+    """Case-insensitive multi-phrase search compiled into one regex.
+
+    The phrases are merged into a trie first and the trie is emitted as
+    nested alternations, so the regex engine follows shared prefixes once
+    per text position instead of trying every phrase in turn.
+    """
+
+    def __init__(self, phrases):
+        trie = {}
+        for phrase in phrases:
+            phrase = phrase.strip().lower()
+            if not phrase:
+                continue
+            node = trie
+            for char in phrase:
+                node = node.setdefault(char, {})
+            node[''] = {}
+
+        self.pattern = re.compile(self._to_regex(trie), re.IGNORECASE) if trie else None
+
+    def _to_regex(self, node):
+        if '' in node:
+            # A shorter phrase ending here already counts as a match
+            return ''
+
+        branches = [re.escape(char) + self._to_regex(child) for char, child in sorted(node.items())]
+        if len(branches) == 1:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')'
+
+    def search(self, text):
+        if self.pattern is None:
+            return None
+        match = self.pattern.search(text)
+        return match.group(0) if match else None
@@ -0,0 +1,84 @@
+"""HTML parser backends for the markdown extractor.
+
+Each backend parses a document and replays it into a builder as balanced
+start/end/data events in document order. 'html.parser' is the pure-Python
+fallback, 'lxml' and 'selectolax' use C parsers when they are installed.
+"""
+from functools import lru_cache
+from types import SimpleNamespace
+from colorama import Fore, Style
+
+DEFAULT_BACKEND = 'html.parser'
+
+def feed_html_parser(content, builder):
+    from bs4 import BeautifulSoup, NavigableString, CData, Tag
+
+    soup = BeautifulSoup(content, 'html.parser')
+    stack = [(None, iter(soup.contents))]
+    while stack:
+        tag, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if tag is not None:
+                builder.end(tag.name)
+        elif isinstance(child, Tag):
+            builder.start(child.name)
+            stack.append((child, iter(child.contents)))
+        elif type(child) in (NavigableString, CData):
+            builder.data(child)
+
+def feed_lxml(content, builder):
+    from lxml import etree
+
+    # libxml2 calls the builder directly while parsing, no tree is kept.
+    # close() is left to the caller so the markdown is only rendered once.
+    target = SimpleNamespace(start=builder.start, end=builder.end, data=builder.data,
+                             close=lambda: None)
+    parser = etree.HTMLParser(target=target)
+    parser.feed(content)
+    parser.close()
+
+def feed_selectolax(content, builder):
+    from selectolax.lexbor import LexborHTMLParser
+
+    root = LexborHTMLParser(content).root
+    root_id = root.mem_id
+    node = root
+    while node is not None:
+        tag = node.tag
+        if tag == '-text':
+            builder.data(node.text_content or '')
+        elif not tag.startswith(('_', '!', '-')):
+            builder.start(tag)
+            if node.child is not None:
+                node = node.child
+                continue
+            builder.end(tag)
+
+        # Climb until there is a sibling to move to, closing parents on the way
+        while node.mem_id != root_id and node.next is None:
+            node = node.parent
+            builder.end(node.tag)
+        node = None if node.mem_id == root_id else node.next
+
+BACKENDS = {
+    'html.parser': (None, feed_html_parser),
+    'lxml': ('lxml', feed_lxml),
+    'selectolax': ('selectolax', feed_selectolax),
+}
+
+@lru_cache(maxsize=None)
+def get_backend(name):
+    if name not in BACKENDS:
+        print(f"{Fore.YELLOW}Unknown parser backend '{name}', using {DEFAULT_BACKEND}{Style.RESET_ALL}")
+        name = DEFAULT_BACKEND
+
+    module, feed = BACKENDS[name]
+    if module:
+        try:
+            __import__(module)
+        except ImportError:
+            print(f"{Fore.YELLOW}{module} is not installed, using {DEFAULT_BACKEND}{Style.RESET_ALL}")
+            return BACKENDS[DEFAULT_BACKEND][1]
+    return feed
@@ -0,0 +1,164 @@
+import asyncio
+import base64
+import aiohttp
+from colorama import Fore, Style
+
+SERP_ENDPOINT = "https://api.dataforseo.com/v3/serp/google/organic/live/advanced"
+SERP_TIMEOUT = 120
+
+class SerpClient:
+    """DataForSEO organic search client with an optional local cache."""
+
+    def __init__(self, config, cache=None):
+        self.config = config
+        self.cache = cache
+        self.session = None
+        cred = base64.b64encode(
+            f"{config.email}:{config.api_key}".encode()
+        ).decode()
+        self.headers = {
+            "Authorization": f"Basic {cred}",
+            "Content-Type": "application/json"
+        }
+
+    async def __aenter__(self):
+        timeout = aiohttp.ClientTimeout(total=SERP_TIMEOUT)
+        self.session = aiohttp.ClientSession(headers=self.headers, timeout=timeout)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+
+    def _task(self, keyword, page, tag=None):
+        task = {
+            "language_code": self.config.language_code,
+            "location_code": self.config.location_code,
+            "keyword": keyword
+        }
+        if page > 1:
+            task["page"] = page
+        if tag is not None:
+            task["tag"] = tag
+        return task
+
+    async def _post(self, tasks):
+        async with self.session.post(SERP_ENDPOINT, json=tasks) as response:
+            response_data = await response.json(content_type=None)
+        if not response_data or 'tasks' not in response_data:
+            raise ValueError("Invalid API response format")
+        return response_data['tasks']
+
+    def _cached(self, keyword, page):
+        if not self.cache:
+            return None
+        cached = self.cache.get(keyword, self.config.language_code, self.config.location_code, page)
+        if cached is not None:
+            print(f"{Fore.GREEN}SERP cache hit: '{keyword}' page {page}{Style.RESET_ALL}")
+            return cached
+        if self.cache.offline:
+            raise ValueError(f"No cached SERP for '{keyword}' page {page} in offline mode")
+        return None
+
+    def _store(self, keyword, page, result):
+        if self.cache:
+            self.cache.store(keyword, self.config.language_code, self.config.location_code, page, result)
+
+    async def search(self, keyword, page=1):
+        """Return the result block for one SERP page of a keyword."""
+        cached = self._cached(keyword, page)
+        if cached is not None:
+            return cached
+
+        task_data = (await self._post([self._task(keyword, page)]))[0]
+        if not task_data.get('result'):
+            raise ValueError(task_data.get('status_message') or "No search results found")
+
+        result = task_data['result'][0]
+        self._store(keyword, page, result)
+        return result
+
+    async def search_many(self, keywords, page=1):
+        """Return {keyword: result block} for one SERP page of many keywords.
+
+        Keywords missing from the cache are packed serp_batch_size tasks per
+        request, and the batches are sent concurrently. Each task carries a
+        tag so results map back to their keyword whatever order the API
+        answers in. Keywords whose task fails are left out of the result.
+        """
+        results = {}
+        missing = []
+        for keyword in keywords:
+            try:
+                cached = self._cached(keyword, page)
+            except ValueError as e:
+                print(f"{Fore.YELLOW}{e}{Style.RESET_ALL}")
+                continue
+            if cached is not None:
+                results[keyword] = cached
+            else:
+                missing.append(keyword)
+
+        batch_size = self.config.serp_batch_size
+        batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+        responses = await asyncio.gather(
+            *[self._post([self._task(keyword, page, str(tag)) for tag, keyword in enumerate(batch)])
+              for batch in batches],
+            return_exceptions=True
+        )
+
+        for batch, tasks in zip(batches, responses):
+            if isinstance(tasks, Exception):
+                print(f"{Fore.RED}SERP batch of {len(batch)} keywords failed: {tasks}{Style.RESET_ALL}")
+                continue
+            for position, task_data in enumerate(tasks):
+                keyword = batch[int((task_data.get('data') or {}).get('tag', position))]
+                if not task_data.get('result'):
+                    message = task_data.get('status_message') or "No search results found"
+                    print(f"{Fore.YELLOW}No SERP results for '{keyword}': {message}{Style.RESET_ALL}")
+                    continue
+                results[keyword] = task_data['result'][0]
+                self._store(keyword, page, results[keyword])
+
+        return results
+
+    async def collect_urls(self, keyword, process_results, limit=10, results=None):
+        """Gather at least `limit` accepted URLs across SERP pages.
+
+        `results` may hold an already fetched first page. After it, up to
+        serp_prefetch_pages further pages are requested at once. Pages are
+        consumed in page order so the result is deterministic, and requests
+        still in flight are cancelled as soon as enough URLs have been
+        collected.
+        """
+        if results is None:
+            results = await self.search(keyword)
+        if not results or 'items' not in results:
+            raise ValueError("No search results found")
+
+        urls = process_results(results['items'])
+        total_pages = results.get('metrics', {}).get('pagination', {}).get('total', 1)
+
+        pending = {}
+        next_page = 2
+        try:
+            while len(urls) < limit:
+                while len(pending) < self.config.serp_prefetch_pages and next_page <= total_pages:
+                    pending[next_page] = asyncio.create_task(self.search(keyword, next_page))
+                    next_page += 1
+                if not pending:
+                    break
+
+                page = min(pending)
+                try:
+                    page_results = await pending.pop(page)
+                except (ValueError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    # Keep what earlier pages gave rather than losing the keyword
+                    print(f"{Fore.YELLOW}Stopping at page {page}: {e!r}{Style.RESET_ALL}")
+                    break
+                urls += process_results(page_results.get('items') or [])
+        finally:
+            for task in pending.values():
+                task.cancel()
+            await asyncio.gather(*pending.values(), return_exceptions=True)
+
+        return urls
@@ -0,0 +1,56 @@
+import json
+import time
+import uuid
+from datetime import datetime
+
+def start_run(db, keywords, run_id=None):
+    """Register a run and return its id.
+
+    Generated ids are a timestamp with a random suffix, so runs started in
+    the same second by parallel processes never share checkpoints.
+    """
+    run_id = run_id or f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    with db.conn:
+        cursor = db.conn.execute('INSERT OR IGNORE INTO runs (id, keywords, created_at) VALUES (?, ?, ?)',
+                                 (run_id, json.dumps(keywords), time.time()))
+    if cursor.rowcount == 0:
+        raise ValueError(f"Run {run_id} already exists")
+    return run_id
+
+def load_run(db, run_id=None):
+    """Return (run_id, keywords) of a stored run, the latest one by default."""
+    if run_id:
+        row = db.conn.execute('SELECT id, keywords FROM runs WHERE id = ?', (run_id,)).fetchone()
+    else:
+        row = db.conn.execute('SELECT id, keywords FROM runs ORDER BY created_at DESC LIMIT 1').fetchone()
+    if not row:
+        return None, []
+    return row[0], json.loads(row[1])
+
+class RunCheckpoints:
+    """Stage outputs of one keyword within a run.
+
+    Each finished stage (SERP URLs, analysed URLs, per-URL filtered
+    content, digest, epoch summaries, final summary and report) is saved
+    as soon as it completes, so a rerun with the same run id picks up from
+    the first stage that has no output yet. Values are stored as JSON,
+    and get() returns None for anything not saved.
+    """
+
+    def __init__(self, db, run_id, keyword):
+        self.db = db
+        self.run_id = run_id
+        self.keyword = keyword
+
+    def get(self, stage, item=''):
+        row = self.db.conn.execute('''SELECT value FROM checkpoints
+                                      WHERE run_id = ? AND keyword = ? AND stage = ? AND item = ?''',
+                                   (self.run_id, self.keyword, stage, item)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, stage, value, item=''):
+        with self.db.conn:
+            self.db.conn.execute('''INSERT OR REPLACE INTO checkpoints
+                                    (run_id, keyword, stage, item, value, created_at)
+                                    VALUES (?, ?, ?, ?, ?, ?)''',
+                                 (self.run_id, self.keyword, stage, item, json.dumps(value), time.time()))
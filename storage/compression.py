@@ -0,0 +1,100 @@
+"""Transparent compression of stored page content.
+
+Compressed values are BLOBs that start with a one-byte codec tag; zstd
+values made with a trained dictionary carry the dictionary id after the
+tag. Plain TEXT values, as written by older versions, are returned as
+they are, so a database can hold both while it is being migrated.
+"""
+import struct
+import zlib
+from colorama import Fore, Style
+
+ZLIB = b'z'
+ZSTD = b's'
+ZSTD_DICT = b'd'
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 10
+DICT_ID = struct.Struct('<I')
+
+METHODS = ('none', 'zlib', 'zstd')
+
+class ContentCodec:
+    """Encodes page content for storage with zlib or zstd.
+
+    zstd comes from the optional zstandard package and falls back to zlib
+    when it is not installed. With a trained dictionary, the boilerplate
+    shared by many pages compresses much better than page by page.
+    `loader` returns the current {id: dictionary bytes}; it is called when
+    a value names a dictionary this codec has not seen, e.g. one trained
+    by another process sharing the database.
+    """
+
+    def __init__(self, method='zlib', dictionaries=None, loader=None):
+        if method not in METHODS:
+            print(f"{Fore.YELLOW}Unknown compression '{method}', using zlib{Style.RESET_ALL}")
+            method = 'zlib'
+        if method == 'zstd':
+            try:
+                import zstandard
+            except ImportError:
+                print(f"{Fore.YELLOW}zstandard is not installed, using zlib{Style.RESET_ALL}")
+                method = 'zlib'
+        self.method = method
+        self.loader = loader
+        self.set_dictionaries(dictionaries or {})
+
+    def set_dictionaries(self, dictionaries):
+        """Use {id: dictionary bytes}; new values use the highest id."""
+        self.dictionaries = dictionaries
+        self.dict_id = max(dictionaries) if dictionaries else None
+        self._compressor = None
+        self._decompressors = {}
+
+    def _zstd_compressor(self):
+        if self._compressor is None:
+            import zstandard
+            if self.dict_id is not None:
+                data = zstandard.ZstdCompressionDict(self.dictionaries[self.dict_id])
+                self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=data)
+            else:
+                self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        return self._compressor
+
+    def _zstd_decompressor(self, dict_id=None):
+        if dict_id not in self._decompressors:
+            import zstandard
+            if dict_id is not None and dict_id not in self.dictionaries and self.loader:
+                self.set_dictionaries(self.loader())
+            if dict_id is not None:
+                data = zstandard.ZstdCompressionDict(self.dictionaries[dict_id])
+                self._decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=data)
+            else:
+                self._decompressors[dict_id] = zstandard.ZstdDecompressor()
+        return self._decompressors[dict_id]
+
+    def encode(self, text):
+        if text is None or self.method == 'none':
+            return text
+        raw = text.encode('utf-8')
+        if self.method == 'zstd':
+            compressed = self._zstd_compressor().compress(raw)
+            if self.dict_id is not None:
+                return ZSTD_DICT + DICT_ID.pack(self.dict_id) + compressed
+            return ZSTD + compressed
+        return ZLIB + zlib.compress(raw, ZLIB_LEVEL)
+
+    def decode(self, value):
+        if value is None or isinstance(value, str):
+            return value
+        value = bytes(value)
+        tag, payload = value[:1], value[1:]
+        if tag == ZLIB:
+            raw = zlib.decompress(payload)
+        elif tag == ZSTD:
+            raw = self._zstd_decompressor().decompress(payload)
+        elif tag == ZSTD_DICT:
+            dict_id = DICT_ID.unpack_from(payload)[0]
+            raw = self._zstd_decompressor(dict_id).decompress(payload[DICT_ID.size:])
+        else:
+            raise ValueError(f"Unknown content encoding {tag!r}")
+        return raw.decode('utf-8')
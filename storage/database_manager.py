@@ -1,56 +1,253 @@
+import re
 import sqlite3
-from datetime import datetime
+import time
 from pathlib import Path
+from colorama import Fore, Style
+from storage.compression import ContentCodec
+from storage.page_cache import content_hash
+
+# zstd dictionary training needs enough pages to find shared boilerplate
+DICT_SIZE = 112 * 1024
+MIN_DICT_SAMPLES = 20
+MAX_DICT_SAMPLES = 2000
+
+SEARCH_TOKEN = re.compile(r'\w+')
+SNIPPET_TOKENS = 32
+# Hits scoring below this share of the best hit are dropped
+SEARCH_MIN_SCORE_RATIO = 0.25
+
+def _compress_existing(db):
+    db.recompress()
+
+def _build_search_index(db):
+    # Rows may already use trained dictionaries that are not loaded yet
+    db.codec.set_dictionaries(db._load_dictionaries())
+    db.conn.execute("INSERT INTO seo_fts(seo_fts) VALUES ('rebuild')")
+
+# Each entry upgrades the schema by one version, tracked in PRAGMA user_version.
+# A step is either an SQL statement or a function called with the manager.
+MIGRATIONS = [
+    # 1: original tables, already present in databases from older runs
+    ['''CREATE TABLE IF NOT EXISTS urls
+                         (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                          url TEXT UNIQUE)''',
+     '''CREATE TABLE IF NOT EXISTS seo_content
+                         (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                          url_id INTEGER,
+                          content TEXT,
+                          FOREIGN KEY(url_id) REFERENCES urls(id))'''],
+    # 2: one content row per URL with crawl metadata, the newest row wins
+    ['DELETE FROM seo_content WHERE id NOT IN (SELECT MAX(id) FROM seo_content GROUP BY url_id)',
+     'ALTER TABLE seo_content ADD COLUMN fetched_at REAL',
+     'ALTER TABLE seo_content ADD COLUMN content_hash TEXT',
+     'CREATE UNIQUE INDEX IF NOT EXISTS idx_seo_content_url_id ON seo_content(url_id)'],
+    # 3: compressed content, plus trained zstd dictionaries
+    ['''CREATE TABLE IF NOT EXISTS compression_dicts
+                         (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                          data BLOB,
+                          created_at REAL)''',
+     _compress_existing],
+    # 4: full-text index over the decoded content. seo_text exposes the text
+    # through the page_text() function every DatabaseManager registers, so
+    # the index keeps no second copy of the pages.
+    ['CREATE VIEW IF NOT EXISTS seo_text AS SELECT id, page_text(content) AS content FROM seo_content',
+     '''CREATE VIRTUAL TABLE IF NOT EXISTS seo_fts USING fts5
+                         (content, content='seo_text', content_rowid='id',
+                          tokenize='porter unicode61')''',
+     '''CREATE TRIGGER IF NOT EXISTS seo_fts_insert AFTER INSERT ON seo_content BEGIN
+                           INSERT INTO seo_fts(rowid, content) VALUES (new.id, page_text(new.content));
+                         END''',
+     '''CREATE TRIGGER IF NOT EXISTS seo_fts_delete AFTER DELETE ON seo_content BEGIN
+                           INSERT INTO seo_fts(seo_fts, rowid, content)
+                           VALUES ('delete', old.id, page_text(old.content));
+                         END''',
+     '''CREATE TRIGGER IF NOT EXISTS seo_fts_update AFTER UPDATE OF content ON seo_content BEGIN
+                           INSERT INTO seo_fts(seo_fts, rowid, content)
+                           VALUES ('delete', old.id, page_text(old.content));
+                           INSERT INTO seo_fts(rowid, content) VALUES (new.id, page_text(new.content));
+                         END''',
+     _build_search_index],
+    # 5: runs and their per-stage checkpoints, so interrupted runs can resume
+    ['''CREATE TABLE IF NOT EXISTS runs
+                         (id TEXT PRIMARY KEY,
+                          keywords TEXT,
+                          created_at REAL)''',
+     '''CREATE TABLE IF NOT EXISTS checkpoints
+                         (run_id TEXT,
+                          keyword TEXT,
+                          stage TEXT,
+                          item TEXT,
+                          value TEXT,
+                          created_at REAL,
+                          PRIMARY KEY (run_id, keyword, stage, item))'''],
+]
 
 class DatabaseManager:
-    def __init__(self):
-        self.db_path = Path("data") / "scraped_urls.db"
+    """Persistent store of scraped URLs and their extracted content.
+
+    The database is kept between runs and upgraded in place by MIGRATIONS.
+    WAL journaling lets the agents read while scrape results are written.
+    Page content is stored compressed; readers pass what they select
+    through read_content() when they need the text.
+    """
+
+    def __init__(self, path=None, compression='zlib', use_dictionary=False):
+        self.db_path = Path(path) if path else Path("data") / "scraped_urls.db"
         self.db_path.parent.mkdir(exist_ok=True)
-        print("Resetting database...")
-        self._reset_db()
-        print("Database reset complete")
+        self.compression = compression
+        self.use_dictionary = use_dictionary
+        self.codec = ContentCodec(compression, loader=self._load_dictionaries)
         self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.create_function('page_text', 1, self.read_content, deterministic=True)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
         self._init_db()
-
-    def _reset_db(self):
-        if self.db_path.exists():
-            try:
-                self.db_path.unlink()
-            except PermissionError:
-                print("Database file locked, creating new database...")
-                timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-                self.db_path = self.db_path.with_name(f"scraped_urls_{timestamp}.db")
+        self.codec.set_dictionaries(self._load_dictionaries())
+        if use_dictionary and self.codec.method == 'zstd' and self.codec.dict_id is None:
+            self.train_dictionary()
 
     def _init_db(self):
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        for number, statements in enumerate(MIGRATIONS[version:], version + 1):
+            print(f"Migrating database to schema version {number}...")
+            with self.conn:
+                for statement in statements:
+                    if callable(statement):
+                        statement(self)
+                    else:
+                        self.conn.execute(statement)
+                self.conn.execute(f'PRAGMA user_version = {number}')
+
+    def _load_dictionaries(self):
+        return dict(self.conn.execute('SELECT id, data FROM compression_dicts').fetchall())
+
+    def read_content(self, value):
+        """Text of a stored seo_content.content value."""
+        return self.codec.decode(value)
+
+    def recompress(self):
+        """Re-encode every stored page with the current codec."""
+        rows = self.conn.execute('SELECT id, content FROM seo_content').fetchall()
+        self.conn.executemany('UPDATE seo_content SET content = ? WHERE id = ?',
+                              [(self.codec.encode(self.read_content(content)), row_id)
+                               for row_id, content in rows])
+        return len(rows)
+
+    def train_dictionary(self):
+        """Train a zstd dictionary on stored pages and recompress them with it.
+
+        Returns the new dictionary id, or None when there are too few pages
+        to train on yet.
+        """
+        import zstandard
+
+        rows = self.conn.execute('SELECT content FROM seo_content ORDER BY RANDOM() LIMIT ?',
+                                 (MAX_DICT_SAMPLES,)).fetchall()
+        samples = [self.read_content(content).encode('utf-8') for content, in rows if content]
+        if len(samples) < MIN_DICT_SAMPLES:
+            return None
+        try:
+            data = zstandard.train_dictionary(DICT_SIZE, samples).as_bytes()
+        except zstandard.ZstdError as e:
+            print(f"{Fore.YELLOW}Could not train a compression dictionary: {e}{Style.RESET_ALL}")
+            return None
+
         with self.conn:
-            self.conn.execute('''CREATE TABLE IF NOT EXISTS urls
-                         (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                          url TEXT UNIQUE)''')
-            self.conn.execute('''CREATE TABLE IF NOT EXISTS seo_content
-                         (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                          url_id INTEGER,
-                          content TEXT,
-                          FOREIGN KEY(url_id) REFERENCES urls(id))''')
+            dict_id = self.conn.execute('INSERT INTO compression_dicts (data, created_at) VALUES (?, ?)',
+                                        (data, time.time())).lastrowid
+            self.codec.set_dictionaries(self._load_dictionaries())
+            count = self.recompress()
+        print(f"{Fore.GREEN}Trained compression dictionary {dict_id} on {len(samples)} pages, "
+              f"recompressed {count} rows{Style.RESET_ALL}")
+        return dict_id
+
+    def _upsert_urls(self, urls):
+        # The no-op update makes RETURNING yield ids for existing URLs too
+        placeholders = ','.join(['(?)'] * len(urls))
+        rows = self.conn.execute(f'''INSERT INTO urls (url) VALUES {placeholders}
+                                     ON CONFLICT(url) DO UPDATE SET url = excluded.url
+                                     RETURNING url, id''', urls).fetchall()
+        return dict(rows)
+
+    def _upsert_contents(self, rows):
+        # rows are (url_id, content, content_hash, fetched_at); unchanged
+        # content only has its fetched_at refreshed
+        self.conn.executemany('''UPDATE seo_content SET fetched_at = ?
+                                 WHERE url_id = ? AND content_hash = ?''',
+                              [(fetched_at, url_id, digest) for url_id, _, digest, fetched_at in rows])
+        self.conn.executemany('''INSERT INTO seo_content
+                                 (url_id, content, content_hash, fetched_at) VALUES (?, ?, ?, ?)
+                                 ON CONFLICT(url_id) DO UPDATE SET content = excluded.content,
+                                 content_hash = excluded.content_hash, fetched_at = excluded.fetched_at
+                                 WHERE seo_content.content_hash IS NOT excluded.content_hash''', rows)
 
     def save_url(self, url):
         try:
             with self.conn:
-                cursor = self.conn.cursor()
-                cursor.execute('''INSERT OR IGNORE INTO urls 
-                               (url) VALUES (?)''', (url,))
-                return cursor.lastrowid
-        except sqlite3.IntegrityError:
-            return None  # Already exists
+                return self._upsert_urls([url])[url]
         except sqlite3.Error as e:
             print(f"Database error: {e}")
             return None
 
-    def save_seo_content(self, url_id, content):  # Reverted to url_id
+    def save_seo_content(self, url_id, content):
+        """Store the content for a URL, replacing any earlier crawl of it."""
         try:
             with self.conn:
-                self.conn.execute('''INSERT INTO seo_content 
-                                  (url_id, content) VALUES (?, ?)''', 
-                                  (url_id, content))  # Reverted to url_id
+                self._upsert_contents([(url_id, self.codec.encode(content),
+                                        content_hash(content.encode('utf-8')), time.time())])
         except sqlite3.OperationalError as e:
             print(f"Database error: {e}")
-            self.conn.rollback() 
\ No newline at end of file
+            self.conn.rollback()
+
+    def save_pages(self, pages):
+        """Store a batch of (url, content) pairs in one transaction.
+
+        Content may be None to record only the URL. Returns {url: id} and
+        raises sqlite3.Error if the batch could not be written.
+        """
+        now = time.time()
+        with self.conn:
+            url_ids = self._upsert_urls(list(dict.fromkeys(url for url, _ in pages)))
+            self._upsert_contents([(url_ids[url], self.codec.encode(content),
+                                    content_hash(content.encode('utf-8')), now)
+                                   for url, content in pages if content])
+        return url_ids
+
+    def fresh_contents(self, urls, max_age):
+        """Return {url: content} for URLs crawled within the last max_age seconds."""
+        if not urls or max_age <= 0:
+            return {}
+        placeholders = ','.join('?' * len(urls))
+        rows = self.conn.execute(f'''SELECT urls.url, seo_content.content FROM seo_content
+                                     JOIN urls ON seo_content.url_id = urls.id
+                                     WHERE urls.url IN ({placeholders}) AND seo_content.fetched_at >= ?''',
+                                 [*urls, time.time() - max_age]).fetchall()
+        return {url: self.read_content(content) for url, content in rows if content}
+
+    def search(self, query, limit=10):
+        """Rank stored pages against a keyword with the full-text index.
+
+        Returns (url, snippet, score) tuples, best first. A page must
+        contain every query word, so one common word such as "in" or "best"
+        is not enough to match, and hits scoring far below the best one are
+        dropped. The keyword is used as plain words rather than FTS5 query
+        syntax.
+        """
+        words = SEARCH_TOKEN.findall(query.lower())
+        if not words:
+            return []
+        match = ' AND '.join(f'"{word}"' for word in dict.fromkeys(words))
+        rows = self.conn.execute(f'''SELECT urls.url,
+                                            snippet(seo_fts, 0, '**', '**', ' ... ', {SNIPPET_TOKENS}),
+                                            bm25(seo_fts)
+                                     FROM seo_fts
+                                     JOIN seo_content ON seo_content.id = seo_fts.rowid
+                                     JOIN urls ON urls.id = seo_content.url_id
+                                     WHERE seo_fts MATCH ?
+                                     ORDER BY rank LIMIT ?''', (match, limit)).fetchall()
+        # FTS5 scores are negative, lower is better
+        results = [(url, snippet, -score) for url, snippet, score in rows]
+        if not results:
+            return []
+        floor = results[0][2] * SEARCH_MIN_SCORE_RATIO
+        return [result for result in results if result[2] >= floor]
@@ -0,0 +1,76 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from storage.database_manager import DatabaseManager
+
+class DatabaseWriter:
+    """Single writer that saves scrape results in batches off the event loop.
+
+    save_page() only queues the page and returns a future for its URL id,
+    so the fetch path never waits on SQLite. A background task drains the
+    queue and hands each batch to one dedicated thread with its own
+    connection, which writes it in a single transaction. Batches grow by
+    themselves when pages arrive faster than they can be committed.
+    """
+
+    def __init__(self, db, batch_size=100):
+        self.source = db
+        self.batch_size = batch_size
+        self.queue = None
+        self.worker = None
+        self.executor = None
+        self.db = None
+        self.batches = 0
+        self.pages = 0
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-writer')
+        # The connection is created on the writer thread and only used there
+        self.db = await loop.run_in_executor(self.executor, DatabaseManager, self.source.db_path,
+                                             self.source.compression, self.source.use_dictionary)
+        self.worker = asyncio.create_task(self._drain())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.queue.put(None)
+        await self.worker
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self.db.conn.close)
+        self.executor.shutdown()
+
+    def save_page(self, url, content):
+        """Queue a page for saving; the future resolves to its URL id."""
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((url, content, future))
+        return future
+
+    async def _drain(self):
+        loop = asyncio.get_running_loop()
+        done = False
+        while not done:
+            batch = []
+            item = await self.queue.get()
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.batch_size or self.queue.empty():
+                    break
+                item = self.queue.get_nowait()
+            done = item is None
+            if not batch:
+                continue
+
+            pages = [(url, content) for url, content, _ in batch]
+            try:
+                url_ids = await loop.run_in_executor(self.executor, self.db.save_pages, pages)
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.pages += len(batch)
+            for url, _, future in batch:
+                future.set_result(url_ids[url])
+
+    def stats(self):
+        return f"{self.pages} pages in {self.batches} batches"
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+class LlmCache:
+    """Persistent cache of chat completions.
+
+    Entries are keyed on a hash of (model, prompt, temperature, max_tokens)
+    so identical requests from reruns or overlapping keywords are answered
+    locally. Entries older than max_age are ignored, and the total stored
+    size is kept under max_bytes by evicting the least recently used ones.
+    With bypass set, lookups are skipped but fresh responses still refresh
+    the cache.
+    """
+
+    def __init__(self, path, max_age, max_bytes, bypass=False):
+        self.db_path = Path(path)
+        self.db_path.parent.mkdir(exist_ok=True)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._init_db()
+        self.total_size = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM completions').fetchone()[0]
+
+    def _init_db(self):
+        with self.conn:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS completions
+                         (key TEXT PRIMARY KEY,
+                          model TEXT,
+                          response TEXT,
+                          size INTEGER,
+                          created_at REAL,
+                          last_access REAL)''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_completions_last_access ON completions(last_access)')
+
+    @staticmethod
+    def make_key(model, prompt, temperature, max_tokens):
+        raw = json.dumps([model, prompt, temperature, max_tokens], ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        if self.bypass:
+            self.misses += 1
+            return None
+
+        row = self.conn.execute('SELECT response, created_at, size FROM completions WHERE key = ?',
+                                (key,)).fetchone()
+        if row and time.time() - row[1] >= self.max_age:
+            self._delete(key, row[2])
+            row = None
+        if not row:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        with self.conn:
+            self.conn.execute('UPDATE completions SET last_access = ? WHERE key = ?', (time.time(), key))
+        return row[0]
+
+    def store(self, key, model, response):
+        size = len(response.encode('utf-8'))
+        now = time.time()
+        with self.conn:
+            old = self.conn.execute('SELECT size FROM completions WHERE key = ?', (key,)).fetchone()
+            self.conn.execute('''INSERT OR REPLACE INTO completions
+                                 (key, model, response, size, created_at, last_access)
+                                 VALUES (?, ?, ?, ?, ?, ?)''',
+                              (key, model, response, size, now, now))
+        self.total_size += size - (old[0] if old else 0)
+        self._evict()
+
+    def _delete(self, key, size):
+        with self.conn:
+            self.conn.execute('DELETE FROM completions WHERE key = ?', (key,))
+        self.total_size -= size
+
+    def _evict(self):
+        if self.total_size <= self.max_bytes:
+            return
+        with self.conn:
+            rows = self.conn.execute('SELECT key, size FROM completions ORDER BY last_access').fetchall()
+            for key, size in rows:
+                if self.total_size <= self.max_bytes:
+                    break
+                self.conn.execute('DELETE FROM completions WHERE key = ?', (key,))
+                self.total_size -= size
+
+    def stats(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"{self.hits} hits, {self.misses} misses ({rate:.0%} hit rate)"
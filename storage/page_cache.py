@@ -0,0 +1,105 @@
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def normalize_url(url):
+    """Cache key for a URL: lowercased scheme/host, no default port, no
+    fragment and query parameters in a stable order."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+def content_hash(body):
+    return hashlib.sha256(body).hexdigest()
+
+class PageCache:
+    """Persistent cache of downloaded pages and their extracted markdown.
+
+    Entries younger than the TTL are served without touching the network.
+    Older entries keep their ETag/Last-Modified validators for a
+    conditional GET, and the total stored body size is kept under max_bytes
+    by evicting the least recently used pages.
+    """
+
+    def __init__(self, path, ttl, max_bytes):
+        self.db_path = Path(path)
+        self.db_path.parent.mkdir(exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._init_db()
+        self.total_size = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+
+    def _init_db(self):
+        with self.conn:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS pages
+                         (url_key TEXT PRIMARY KEY,
+                          url TEXT,
+                          content_type TEXT,
+                          etag TEXT,
+                          last_modified TEXT,
+                          body BLOB,
+                          content_hash TEXT,
+                          markdown TEXT,
+                          size INTEGER,
+                          fetched_at REAL,
+                          last_access REAL)''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_pages_last_access ON pages(last_access)')
+
+    def get(self, url):
+        row = self.conn.execute('''SELECT etag, last_modified, content_hash, markdown, fetched_at
+                                   FROM pages WHERE url_key = ?''', (normalize_url(url),)).fetchone()
+        if not row:
+            return None
+        etag, last_modified, body_hash, markdown, fetched_at = row
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_hash': body_hash,
+            'markdown': markdown,
+            'fresh': time.time() - fetched_at < self.ttl
+        }
+
+    def touch(self, url, revalidated=False):
+        """Mark an entry as used; a successful revalidation also restarts its TTL."""
+        now = time.time()
+        with self.conn:
+            if revalidated:
+                self.conn.execute('UPDATE pages SET last_access = ?, fetched_at = ? WHERE url_key = ?',
+                                  (now, now, normalize_url(url)))
+            else:
+                self.conn.execute('UPDATE pages SET last_access = ? WHERE url_key = ?',
+                                  (now, normalize_url(url)))
+
+    def store(self, url, content_type, etag, last_modified, body, body_hash, markdown):
+        key = normalize_url(url)
+        now = time.time()
+        with self.conn:
+            old = self.conn.execute('SELECT size FROM pages WHERE url_key = ?', (key,)).fetchone()
+            self.conn.execute('''INSERT OR REPLACE INTO pages
+                                 (url_key, url, content_type, etag, last_modified, body,
+                                  content_hash, markdown, size, fetched_at, last_access)
+                                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                              (key, url, content_type, etag, last_modified, body,
+                               body_hash, markdown, len(body), now, now))
+        self.total_size += len(body) - (old[0] if old else 0)
+        self._evict()
+
+    def _evict(self):
+        if self.total_size <= self.max_bytes:
+            return
+        with self.conn:
+            rows = self.conn.execute('SELECT url_key, size FROM pages ORDER BY last_access').fetchall()
+            for key, size in rows:
+                if self.total_size <= self.max_bytes:
+                    break
+                self.conn.execute('DELETE FROM pages WHERE url_key = ?', (key,))
+                self.total_size -= size
@@ -0,0 +1,51 @@
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+class SerpCache:
+    """Local store of DataForSEO results keyed by keyword, locale and page.
+
+    Results younger than the TTL are returned instead of calling the API.
+    In offline mode the TTL is ignored so previous runs can be replayed
+    without network access or API cost.
+    """
+
+    def __init__(self, path, ttl, offline=False):
+        self.db_path = Path(path)
+        self.db_path.parent.mkdir(exist_ok=True)
+        self.ttl = ttl
+        self.offline = offline
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._init_db()
+
+    def _init_db(self):
+        with self.conn:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS serp_results
+                         (keyword TEXT,
+                          language_code TEXT,
+                          location_code INTEGER,
+                          page INTEGER,
+                          result TEXT,
+                          fetched_at REAL,
+                          PRIMARY KEY (keyword, language_code, location_code, page))''')
+
+    def get(self, keyword, language_code, location_code, page):
+        row = self.conn.execute('''SELECT result, fetched_at FROM serp_results
+                                   WHERE keyword = ? AND language_code = ?
+                                   AND location_code = ? AND page = ?''',
+                                (keyword.lower(), language_code, location_code, page)).fetchone()
+        if not row:
+            return None
+        result, fetched_at = row
+        if not self.offline and time.time() - fetched_at >= self.ttl:
+            return None
+        return json.loads(result)
+
+    def store(self, keyword, language_code, location_code, page, result):
+        with self.conn:
+            self.conn.execute('''INSERT OR REPLACE INTO serp_results
+                                 (keyword, language_code, location_code, page, result, fetched_at)
+                                 VALUES (?, ?, ?, ?, ?, ?)''',
+                              (keyword.lower(), language_code, location_code, page,
+                               json.dumps(result), time.time()))
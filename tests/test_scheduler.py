@@ -0,0 +1,85 @@
+"""RequestScheduler retries and window control against FakeOpenRouter."""
+import asyncio
+import socket
+from types import SimpleNamespace
+import pytest
+from agents.llm_client import OpenRouterClient
+from benchmarks.fake_openrouter import FakeOpenRouter
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def make_config(max_connections=4, max_retries=3):
+    return SimpleNamespace(openrouter_api_key="test", llm_max_connections=max_connections,
+                           llm_max_retries=max_retries, llm_retry_base_delay=0.01,
+                           llm_retry_max_delay=0.05, llm_timeout=10)
+
+def run(server, config, scenario):
+    """Run scenario(llm, send) against the server; send(prompt) goes through the scheduler."""
+    async def main():
+        url = await server.start(free_port())
+        try:
+            async with OpenRouterClient(config) as llm:
+                llm.base_url = url
+
+                def send(prompt):
+                    payload = {"model": "test", "messages": [{"role": "user", "content": prompt}]}
+                    return llm.scheduler.run(lambda: llm._post(payload))
+
+                await scenario(llm, send)
+        finally:
+            await server.stop()
+    asyncio.run(main())
+
+def test_retry_after_is_honoured_and_retried():
+    server = FakeOpenRouter(max_concurrent=10, latency=0, error_rate=0, retry_after=0.05, statuses=[429])
+
+    async def scenario(llm, send):
+        assert await send("hello") == "Echo: hello"
+        assert llm.scheduler.retries == 1
+
+    run(server, make_config(), scenario)
+    assert server.throttled == 1
+
+def test_window_halves_once_per_burst_and_grows_back():
+    server = FakeOpenRouter(max_concurrent=100, latency=0, error_rate=0, retry_after=0.01,
+                            statuses=[429] * 8)
+
+    async def scenario(llm, send):
+        scheduler = llm.scheduler
+        # All eight are sent under the same window, so their 429s count as one decrease
+        await asyncio.gather(*[send(f"burst {i}") for i in range(8)])
+        assert scheduler.generation == 1
+        assert 4 < scheduler.limit < 8
+
+        for i in range(40):
+            await send(f"more {i}")
+        assert scheduler.generation == 1
+        assert scheduler.limit == 8
+
+    run(server, make_config(max_connections=8), scenario)
+    assert server.throttled == 8
+
+def test_gives_up_after_max_retries():
+    server = FakeOpenRouter(max_concurrent=10, latency=0, error_rate=0, statuses=[503] * 10)
+
+    async def scenario(llm, send):
+        with pytest.raises(Exception, match="gave up after 3 attempts"):
+            await send("hello")
+        assert llm.scheduler.failures == 1
+
+    run(server, make_config(max_retries=2), scenario)
+    assert server.errors == 3
+
+def test_client_error_is_not_retried():
+    server = FakeOpenRouter(max_concurrent=10, latency=0, error_rate=0, statuses=[400, 400])
+
+    async def scenario(llm, send):
+        with pytest.raises(Exception, match="OpenRouter API error"):
+            await send("hello")
+        assert llm.scheduler.retries == 0
+
+    run(server, make_config(), scenario)
+    assert server.errors == 1